@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+'''
+Compare the filtering backends of ListValidator over growing choice sets.
+
+For each size, the time to rebuild the filtered view with a PreFilter,
+PostFilter and SubFilter is reported for the plain Python scan, the
+ChoiceIndex and (if NumPy is installed) the vectorized backend.  The
+answers change on every rebuild so the cached view is never reused.  The
+first size at which each backend beats the scan is printed at the end.
+
+A second table includes building the index or NumPy array, which is paid
+once per choice set.
+
+    $ PYTHONPATH=. python benchmarks/filters.py
+'''
+
+import timeit
+
+from qav import vectorized
+from qav.filters import PostFilter, PreFilter, SubFilter
+from qav.validators import ListValidator
+
+SIZES = (10, 100, 1000, 10000, 100000)
+REPEAT = 20
+
+
+def make_choices(size: int):
+    return ['host%06d.rack%d.example.com' % (i, i % 40) for i in range(size)]
+
+
+def make_validator(size: int, backend: str, choices=None) -> ListValidator:
+    if choices is None:
+        choices = make_choices(size)
+    v = ListValidator(choices, filters=[PreFilter('prefix'),
+                                        PostFilter('.example.com'),
+                                        SubFilter('rack')])
+    v.index_threshold = 0 if backend == 'index' else None
+    v.vectorize = backend == 'numpy'
+    v.vectorize_threshold = 0
+    v.answers = {'prefix': 'host', 'rack': 'rack'}
+    return v
+
+
+def bench(size: int, backend: str) -> float:
+    v = make_validator(size, backend)
+    v.choices  # build the index or vectors outside of the timing
+    racks = ['rack%d.' % (i % 40) for i in range(REPEAT)]
+
+    def run():
+        for rack in racks:
+            v.answers = {'prefix': 'host0', 'rack': rack}
+            v.choices
+
+    return min(timeit.repeat(run, number=1, repeat=3)) / REPEAT
+
+
+def bench_cold(size: int, backend: str) -> float:
+    choices = make_choices(size)
+
+    def run():
+        make_validator(size, backend, choices).choices
+
+    return min(timeit.repeat(run, number=1, repeat=3))
+
+
+def table(title: str, func, backends) -> None:
+    print(title)
+    print('%10s' % 'choices' + ''.join('%12s' % b for b in backends))
+    crossover = {}
+    for size in SIZES:
+        timings = {b: func(size, b) for b in backends}
+        print('%10d' % size +
+              ''.join('%10.3fms' % (timings[b] * 1000) for b in backends))
+        for b in backends[1:]:
+            if b not in crossover and timings[b] < timings['scan']:
+                crossover[b] = size
+    for b in backends[1:]:
+        print('%s beats the scan from %s choices' %
+              (b, crossover.get(b, 'more than %d' % SIZES[-1])))
+    print()
+
+
+def main() -> None:
+    backends = ['scan', 'index']
+    if vectorized.available():
+        backends.append('numpy')
+    else:
+        print('NumPy is not installed; skipping the vectorized backend.')
+    table('Rebuilding the filtered view:', bench, backends)
+    table('Building and filtering a new choice set:', bench_cold, backends)
+
+
+if __name__ == '__main__':
+    main()
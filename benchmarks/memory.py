@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+'''
+Measure the memory held per object by the slotted qav classes.
+
+Each class is compared with a subclass that adds nothing but an instance
+__dict__, i.e. the layout the classes had before __slots__.  Objects are
+built the way a generated per-port questionnaire builds them and kept
+alive while tracemalloc measures them.
+
+    $ PYTHONPATH=. python benchmarks/memory.py
+'''
+
+import tracemalloc
+
+from qav.filters import DynamicFilter, PreFilter, SubFilter
+from qav.listpack import ListPack
+from qav.questions import Question
+from qav.validators import HashValidator, IntegerValidator, ListValidator
+
+COUNT = 20000
+SPEEDS = ['100M', '1G', '10G', '25G', '40G', '100G']
+VLANS = {'vlan%d' % i: 'VLAN %d' % i for i in range(10)}
+
+
+def with_dict(cls):
+    '''Return `cls` with an instance __dict__ added back.'''
+    return type(cls.__name__, (cls,), {})
+
+
+def per_object(make) -> float:
+    '''Return the bytes held by each of COUNT objects from make(i).'''
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [make(i) for i in range(COUNT)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del objects
+    return size / COUNT
+
+
+def cases(wrap):
+    pre, sub, dynamic = wrap(PreFilter), wrap(SubFilter), wrap(DynamicFilter)
+    integer, lst, hsh = wrap(IntegerValidator), wrap(ListValidator), \
+        wrap(HashValidator)
+    question, listpack = wrap(Question), wrap(ListPack)
+    return [
+        ('PreFilter', lambda i: pre('port%d' % i)),
+        ('SubFilter', lambda i: sub('port%d' % i)),
+        ('DynamicFilter', lambda i: dynamic(str.isdigit)),
+        ('IntegerValidator', lambda i: integer()),
+        ('ListValidator', lambda i: lst(SPEEDS, filters=[pre('speed')])),
+        ('HashValidator', lambda i: hsh(VLANS)),
+        ('Question', lambda i: question('Speed of port %d?' % i,
+                                        'speed%d' % i, lst(SPEEDS))),
+        ('ListPack', lambda i: listpack([('port', i)])),
+    ]
+
+
+def main() -> None:
+    print('%-18s%12s%12s%10s' % ('bytes/object', '__dict__', '__slots__',
+                                 'saved'))
+    for (name, plain), (_, slotted) in zip(cases(with_dict),
+                                           cases(lambda cls: cls)):
+        before, now = per_object(plain), per_object(slotted)
+        print('%-18s%12.0f%12.0f%9.0f%%' %
+              (name, before, now, 100 * (before - now) / before))
+
+
+if __name__ == '__main__':
+    main()
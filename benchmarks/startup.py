@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+'''
+Measure what importing each qav module costs a fresh interpreter.
+
+Every module is imported REPEAT times in a new process run with
+`-X importtime`, and the fastest self and cumulative times are reported
+with the slowest modules it imports directly.  Bytecode is cached in a
+temporary directory first so that compiling the sources is not counted.
+
+The script fails if importing qav.questions, which every command line tool
+pays for, takes longer than the budget or loads any of the modules qav only
+imports on first use.
+
+    $ PYTHONPATH=. python benchmarks/startup.py [--budget MS]
+'''
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from typing import Dict, List, Tuple
+
+MODULES = ('qav.console', 'qav.filters', 'qav.index', 'qav.listpack',
+           'qav.providers', 'qav.questions', 'qav.replay', 'qav.resolver',
+           'qav.sqlsource', 'qav.template', 'qav.utils', 'qav.validators',
+           'qav.vectorized')
+ENTRY = 'qav.questions'
+# milliseconds ENTRY may take to import, including typing
+BUDGET = 50.0
+# imported on first use rather than by ENTRY
+DEFERRED = ('asyncio', 'concurrent.futures', 'datetime', 'ipaddress',
+            'netaddr', 'numpy', 'socket', 'sqlite3')
+REPEAT = 5
+
+# name: (depth, self ms, cumulative ms)
+Times = Dict[str, Tuple[int, float, float]]
+
+
+def import_times(module: str, env: Dict[str, str]) -> Times:
+    '''
+    Return the import times of `module` and everything it imported, leaving
+    out what the interpreter imported at startup.
+    '''
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+        env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times: Times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            own, cumulative = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # the header
+        # the name is indented two spaces for every level of nesting
+        name = fields[2][1:].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.lstrip()
+        times[name] = (depth, own / 1000.0, cumulative / 1000.0)
+        # a module is listed after its imports, so a top level module ends
+        # the imports of one statement
+        if depth == 0:
+            if name == module:
+                return times
+            times = {}
+    raise RuntimeError('no import time reported for %s' % module)
+
+
+def best_times(module: str, env: Dict[str, str]) -> Times:
+    '''Return the fastest times seen over REPEAT imports of `module`.'''
+    best: Times = {}
+    for _ in range(REPEAT):
+        for name, (depth, own, cumulative) in \
+                import_times(module, env).items():
+            if name in best:
+                own = min(own, best[name][1])
+                cumulative = min(cumulative, best[name][2])
+            best[name] = (depth, own, cumulative)
+    return best
+
+
+def slowest(module: str, times: Times, count: int = 3) -> List[str]:
+    '''Return the `count` slowest modules `module` imports directly.'''
+    direct = [(cumulative, name) for name, (depth, own, cumulative)
+              in times.items()
+              if depth == 1 and name != 'qav' and not name.startswith('qav.')]
+    return ['%s %.1fms' % (name, cumulative)
+            for cumulative, name in sorted(direct, reverse=True)[:count]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--budget', type=float, default=BUDGET,
+                        help='milliseconds %s may take to import (%%(default)s)'
+                        % ENTRY)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=cache)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        subprocess.run([sys.executable, '-c', 'import ' + ', '.join(MODULES)],
+                       env=env, check=True)
+        print('%-16s%10s%12s   %s' %
+              ('module', 'self', 'cumulative', 'slowest imports'))
+        entry: Times = {}
+        for module in MODULES:
+            times = best_times(module, env)
+            depth, own, cumulative = times[module]
+            print('%-16s%8.1fms%10.1fms   %s' %
+                  (module, own, cumulative,
+                   ', '.join(slowest(module, times))))
+            if module == ENTRY:
+                entry = times
+    failures = []
+    cumulative = entry[ENTRY][2]
+    if cumulative > args.budget:
+        failures.append('importing %s took %.1fms, over the %.1fms budget' %
+                        (ENTRY, cumulative, args.budget))
+    for module in DEFERRED:
+        if module in entry:
+            failures.append('importing %s loaded %s' % (ENTRY, module))
+    print()
+    if failures:
+        print('\n'.join(failures))
+        sys.exit(1)
+    print('%s imports in %.1fms, within the %.1fms budget' %
+          (ENTRY, cumulative, args.budget))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+import sys
+
+from typing import IO, Any, List, Optional, Union
+
+
+class Console(object):
+
+    '''
+    The input and output streams questions are asked over.
+
+    Output is buffered and written to `stdout` in one go when the next
+    prompt is shown, or when flush() is called.  Answers are read a line at
+    a time from `stdin`.  Either stream defaults to the current sys.stdin or
+    sys.stdout; with neither given, prompts are read with input() so that
+    line editing keeps working on a terminal.
+
+    prompt_async() takes turns: concurrent prompts are shown and answered
+    one at a time, and the console's buffer is only touched from the event
+    loop's thread.
+    '''
+
+    def __init__(self, stdin: Optional[IO[str]] = None,
+                 stdout: Optional[IO[str]] = None) -> None:
+        self.stdin = stdin
+        self.stdout = stdout
+        self._buffer: List[str] = []
+        self._lock: Any = None
+        self._lock_loop: Any = None
+        self._reader: Any = None
+
+    def write(self, text: str) -> int:
+        self._buffer.append(text)
+        return len(text)
+
+    def writeline(self, text: str = '') -> None:
+        self._buffer.append(text)
+        self._buffer.append('\n')
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        out = self.stdout if self.stdout is not None else sys.stdout
+        text = ''.join(self._buffer)
+        self._buffer = []
+        out.write(text)
+        out.flush()
+
+    def prompt(self, text: str) -> str:
+        """ Show `text` after any buffered output and read one answer.
+
+            Raises EOFError once the input is exhausted, like input().
+        """
+        if self.stdin is None and self.stdout is None:
+            self.flush()
+            return input(text)
+        self.write(text)
+        self.flush()
+        source = self.stdin if self.stdin is not None else sys.stdin
+        line = source.readline()
+        if not line:
+            raise EOFError
+        return line.rstrip('\r\n')
+
+    def _prompt_lock(self, loop: Any) -> Any:
+        import asyncio
+        # an asyncio.Lock belongs to the loop it is first used on
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _read_in_thread(self, loop: Any, func: Any, *args: Any) -> Any:
+        if self._reader is None:
+            # reads are taken in turn, so a single thread serves them all
+            from concurrent.futures import ThreadPoolExecutor
+            self._reader = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='qav-console')
+        return loop.run_in_executor(self._reader, func, *args)
+
+    async def prompt_async(self, text: str) -> str:
+        """ Like prompt(), but waits for the answer without blocking the
+            event loop.
+
+            The prompt is shown once every earlier prompt_async() call on
+            this console has been answered.  Buffered output is written from
+            the event loop's thread; only the blocking read runs on the
+            console's reader thread.
+        """
+        import asyncio
+        loop = asyncio.get_event_loop()
+        async with self._prompt_lock(loop):
+            if self.stdin is None and self.stdout is None:
+                self.flush()
+                return await self._read_in_thread(loop, input, text)
+            self.write(text)
+            self.flush()
+            source = self.stdin if self.stdin is not None else sys.stdin
+            line = await self._read_in_thread(loop, source.readline)
+        if not line:
+            raise EOFError
+        return line.rstrip('\r\n')
+
+
+# where menus and summaries can be written
+Output = Union[IO[str], Console]
+
+_console = Console()
+
+
+def get_console() -> Console:
+    '''Return the console questions use unless given their own streams.'''
+    return _console
@@ -1,25 +1,103 @@
 # qav (Question Answer Validation)
 # Copyright (C) 2015 UMIACS
 
-from typing import Callable
+from typing import Any, Callable, FrozenSet, List, Optional, Set, Tuple
+
+from .index import ChoiceIndex
+from .vectorized import ChoiceVectors
+
+
+def _glob_literal(s: str) -> str:
+    '''Escape `s` so that it matches itself in an SQLite GLOB pattern.'''
+    return ''.join('[%s]' % c if c in '*?[' else c for c in s)
 
 
 class Filter(object):
 
+    __slots__ = ('string',)
+
     def __init__(self, string: str) -> None:
         self.string = string
 
+    def resolve(self, table=None) -> str:
+        '''
+        Return the string to filter on.  If `string` names an answer in
+        `table`, that answer is used instead.
+        '''
+        if table is not None and self.string in table:
+            return table[self.string]
+        return self.string
+
+    def dependencies(self) -> Optional[FrozenSet[str]]:
+        '''
+        Return the answer keys this filter may read, or None if unknown.
+        '''
+        return frozenset([self.string])
+
+    def filter(self, value: Any, table=None) -> bool:
+        '''Return True if the value should be pruned; False otherwise.'''
+        raise NotImplementedError
+
+    def bind(self, table=None) -> Callable[[Any], bool]:
+        '''
+        Return a function of one value doing what filter() does with
+        `table`, for applying the filter to many values in one pass.
+        '''
+        return lambda value: self.filter(value, table)
+
+    def select(self, index: ChoiceIndex, table=None) -> Optional[Set[int]]:
+        '''
+        Return the positions in `index` of the values this filter keeps, or
+        None if the filter can not be answered from the index.
+        '''
+        return None
+
+    def mask(self, vectors: ChoiceVectors, table=None) -> Any:
+        '''
+        Return a boolean array marking the values in `vectors` this filter
+        keeps, or None if the filter can not be vectorized.
+        '''
+        return None
+
+    def predicate(self, column: str,
+                  table=None) -> Optional[Tuple[str, List]]:
+        '''
+        Return an SQL condition on `column`, a quoted identifier, that holds
+        for the values this filter keeps, and its parameters; or None if the
+        filter can not be expressed in SQL.
+        '''
+        return None
+
+    def _glob(self, column: str, table, pattern: str
+              ) -> Optional[Tuple[str, List]]:
+        s = self.resolve(table)
+        if not isinstance(s, str):
+            return None
+        # GLOB is case-sensitive, like the string methods used by filter()
+        return '%s GLOB ?' % column, [pattern % _glob_literal(s)]
+
 
 class DynamicFilter(Filter):
 
     '''
     A Filter that can dynamically prune choices based off of whether
     filterable_func(choice[, table]) returns True or False.
+
+    `table` is a read-only Mapping of the answers given so far, not a dict.
+    The validator records which answers are read from it, with [], `in` or
+    get(), so that its cached choices are only rebuilt when one of those
+    answers changes.  Iterating it makes every answer a dependency.  Copy
+    it with dict(table) if a real dict is needed.
     '''
 
+    __slots__ = ('filterable_func',)
+
     def __init__(self, filterable_func: Callable) -> None:
         self.filterable_func = filterable_func
 
+    def dependencies(self) -> Optional[FrozenSet[str]]:
+        return None
+
     def filter(self, value: str, table=None) -> bool:
         '''
         Return True if the value should be pruned; False otherwise.
@@ -39,16 +117,29 @@ class SubFilter(Filter):
     SubFilter keeps those choices containing a given substring.
     '''
 
+    __slots__ = ()
+
     def filter(self, value: str, table=None) -> bool:
-        if table is not None and self.string in table:
-            s = table[self.string]
-        else:
-            s = self.string
+        s = self.resolve(table)
         if value.count(s) > 0:
             return False
         else:
             return True
 
+    def bind(self, table=None) -> Callable[[Any], bool]:
+        s = self.resolve(table)
+        return lambda value: s not in value
+
+    def select(self, index: ChoiceIndex, table=None) -> Optional[Set[int]]:
+        return index.contains(self.resolve(table))
+
+    def mask(self, vectors: ChoiceVectors, table=None) -> Any:
+        return vectors.contains(self.resolve(table))
+
+    def predicate(self, column: str,
+                  table=None) -> Optional[Tuple[str, List]]:
+        return self._glob(column, table, '*%s*')
+
 
 class PreFilter(Filter):
 
@@ -56,16 +147,29 @@ class PreFilter(Filter):
     PreFilter keeps those choices starting with a given substring.
     '''
 
+    __slots__ = ()
+
     def filter(self, value: str, table=None) -> bool:
-        if table is not None and self.string in table:
-            s = table[self.string]
-        else:
-            s = self.string
+        s = self.resolve(table)
         if value.startswith(s):
             return False
         else:
             return True
 
+    def bind(self, table=None) -> Callable[[Any], bool]:
+        s = self.resolve(table)
+        return lambda value: not value.startswith(s)
+
+    def select(self, index: ChoiceIndex, table=None) -> Optional[Set[int]]:
+        return index.startswith(self.resolve(table))
+
+    def mask(self, vectors: ChoiceVectors, table=None) -> Any:
+        return vectors.startswith(self.resolve(table))
+
+    def predicate(self, column: str,
+                  table=None) -> Optional[Tuple[str, List]]:
+        return self._glob(column, table, '%s*')
+
 
 class PostFilter(Filter):
 
@@ -73,12 +177,25 @@ class PostFilter(Filter):
     PostFilter keeps those choices ending with a given substring.
     '''
 
+    __slots__ = ()
+
     def filter(self, value: str, table=None) -> bool:
-        if table is not None and self.string in table:
-            s = table[self.string]
-        else:
-            s = self.string
+        s = self.resolve(table)
         if value.endswith(s):
             return False
         else:
             return True
+
+    def bind(self, table=None) -> Callable[[Any], bool]:
+        s = self.resolve(table)
+        return lambda value: not value.endswith(s)
+
+    def select(self, index: ChoiceIndex, table=None) -> Optional[Set[int]]:
+        return index.endswith(self.resolve(table))
+
+    def mask(self, vectors: ChoiceVectors, table=None) -> Any:
+        return vectors.endswith(self.resolve(table))
+
+    def predicate(self, column: str,
+                  table=None) -> Optional[Tuple[str, List]]:
+        return self._glob(column, table, '*%s')
@@ -0,0 +1,114 @@
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set
+
+
+def _upper_bound(prefix: str) -> Optional[str]:
+    '''
+    Return the smallest string greater than every string starting with
+    `prefix`, or None if there is no such string.
+    '''
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+class ChoiceIndex(object):
+
+    '''
+    Indexes for answering PreFilter, PostFilter and SubFilter queries over a
+    fixed sequence of strings without scanning all of them.
+
+    Queries return the set of positions (into the original sequence) whose
+    string starts with, ends with or contains the given string.  Each index
+    is built the first time it is needed:
+
+    - prefixes use a sorted array searched with bisect,
+    - suffixes use a sorted array of the reversed strings,
+    - substrings use a trigram index; the positions holding the query's
+      rarest trigram are checked with `in`.
+
+    Queries that can not be answered from the index (non-string queries,
+    substrings shorter than a trigram) return None.
+    '''
+
+    NGRAM = 3
+
+    def __init__(self, values: List[str]) -> None:
+        self.values = values
+        self._prefix_keys: Optional[List[str]] = None
+        self._prefix_pos: List[int] = []
+        self._suffix_keys: Optional[List[str]] = None
+        self._suffix_pos: List[int] = []
+        self._ngrams: Optional[Dict[str, List[int]]] = None
+
+    @classmethod
+    def build(cls, values: List) -> Optional['ChoiceIndex']:
+        '''Return an index over `values`, or None if they are not all strings.'''
+        for value in values:
+            if not isinstance(value, str):
+                return None
+        return cls(values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @staticmethod
+    def _sorted(keys: List[str]):
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        return [keys[i] for i in order], order
+
+    @staticmethod
+    def _range(keys: List[str], positions: List[int], s: str) -> Set[int]:
+        lo = bisect_left(keys, s)
+        upper = _upper_bound(s)
+        hi = len(keys) if upper is None else bisect_left(keys, upper, lo)
+        return set(positions[lo:hi])
+
+    def startswith(self, s: str) -> Optional[Set[int]]:
+        if not isinstance(s, str):
+            return None
+        if self._prefix_keys is None:
+            self._prefix_keys, self._prefix_pos = self._sorted(self.values)
+        return self._range(self._prefix_keys, self._prefix_pos, s)
+
+    def endswith(self, s: str) -> Optional[Set[int]]:
+        if not isinstance(s, str):
+            return None
+        if self._suffix_keys is None:
+            self._suffix_keys, self._suffix_pos = self._sorted(
+                [value[::-1] for value in self.values])
+        return self._range(self._suffix_keys, self._suffix_pos, s[::-1])
+
+    def _ngram_index(self) -> Dict[str, List[int]]:
+        if self._ngrams is None:
+            n = self.NGRAM
+            ngrams: Dict[str, List[int]] = {}
+            for pos, value in enumerate(self.values):
+                for gram in {value[i:i + n]
+                             for i in range(len(value) - n + 1)}:
+                    ngrams.setdefault(gram, []).append(pos)
+            self._ngrams = ngrams
+        return self._ngrams
+
+    def contains(self, s: str) -> Optional[Set[int]]:
+        n = self.NGRAM
+        if not isinstance(s, str) or len(s) < n:
+            return None
+        ngrams = self._ngram_index()
+        # every match contains each trigram of `s`, so checking the
+        # positions of the rarest one is enough
+        rarest: List[int] = []
+        for i in range(len(s) - n + 1):
+            posting = ngrams.get(s[i:i + n])
+            if posting is None:
+                return set()
+            if i == 0 or len(posting) < len(rarest):
+                rarest = posting
+        values = self.values
+        return {pos for pos in rarest if s in values[pos]}
@@ -1,10 +1,34 @@
 # qav (Question Answer Validation)
 # Copyright (C) 2015 UMIACS
 
-from typing import List, Tuple
+from collections import deque
+from typing import Any, Deque, Iterator, List, Optional, Tuple
+
+from .console import Output
+
+# (item, calc(item), bold(item))
+_Entry = Tuple[Any, int, str]
+# (entries, rendered text, length)
+_Line = Tuple[List[_Entry], str, int]
 
 
 class ListPack(object):
+
+    '''
+    Packs (label, value) items into lines of at most `width` characters.
+
+    Items are kept in a deque, so appending and prepending are O(1).  The
+    laid out lines are cached once the pack has been rendered, and adding,
+    replacing or removing an item only reflows the lines it affects:
+    reflowing stops as soon as a line starts with the same item it did
+    before, since everything after it is then laid out exactly as it was.
+    Changing `sep`, `padding`, `new_line` or `width` lays the pack out
+    again.
+    '''
+
+    __slots__ = ('sep', 'padding', 'indentation', 'width', '_lp', 'new_line',
+                 '_lines', '_layout_key')
+
     BOLD = '\033[1m'
     OFF = '\033[0m'
 
@@ -15,11 +39,13 @@ class ListPack(object):
         self.indentation = indentation
         self.width = width
         if lp:
-            self._lp = lp
+            self._lp: Deque = deque(lp)
         else:
-            self._lp = []
+            self._lp = deque()
 
         self.new_line = '' + (' ' * self.indentation)
+        self._lines: List[_Line] = []
+        self._layout_key: Optional[Tuple] = None
 
     def calc(self, t: List) -> int:
         s1, s2 = t
@@ -30,26 +56,170 @@ class ListPack(object):
         return '%s%s%s%s%s%s' % (self.BOLD, str(s1), self.OFF, self.sep,
                                  str(s2), self.padding)
 
+    def __len__(self) -> int:
+        return len(self._lp)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._lp)
+
     def append_item(self, item: Tuple['str', 'str']) -> None:
         self._lp.append(item)
+        if not self._layout_is_current():
+            return
+        lines = self._lines
+        entry = self._entry(item)
+        if not lines:
+            self._flow(0, [entry], 0)
+            return
+        entries, text, length = lines[-1]
+        if length + entry[1] > self.width:
+            lines.append(self._line([entry]))
+        else:
+            lines[-1] = (entries + [entry], text + entry[2],
+                         length + entry[1])
 
     def prepend_item(self, item: Tuple['str', 'str']) -> None:
-        self._lp.insert(0, item)
+        self._lp.appendleft(item)
+        if self._layout_is_current():
+            self._flow(0, [self._entry(item)], 0)
 
-    def __str__(self) -> str:
-        _str = ''
-        line = self.new_line
-        line_length = len(line)
-        for i in self._lp:
-            if line_length + self.calc(i) > self.width:
-                if _str != '':
-                    _str = _str + '\n' + line
-                else:
-                    _str = line
-                line = self.new_line + self.bold(i)
-                line_length = len(self.new_line) + self.calc(i)
+    def remove_item(self, item: Tuple['str', 'str']) -> None:
+        """ Remove the first occurrence of `item`.
+
+            Raises ValueError if it is not present.
+        """
+        self._lp.remove(item)
+        if not self._layout_is_current():
+            return
+        lines = self._lines
+        for number, (entries, text, length) in enumerate(lines):
+            for position, entry in enumerate(entries):
+                if entry[0] == item:
+                    lines[number] = self._line(
+                        entries[:position] + entries[position + 1:])
+                    # the line before may now have room for what follows
+                    self._flow(max(number - 1, 0), [], number + 1)
+                    return
+
+    def set_item(self, index: int, item: Tuple['str', 'str']) -> None:
+        """ Replace the item at position `index`.
+
+            Raises IndexError if there is no such item.
+        """
+        self._lp[index] = item
+        if not self._layout_is_current():
+            return
+        if index < 0:
+            index += len(self._lp)
+        lines = self._lines
+        for number, (entries, text, length) in enumerate(lines):
+            if index < len(entries):
+                entries = list(entries)
+                entries[index] = self._entry(item)
+                lines[number] = self._line(entries)
+                # the item may now fit on the line before, or push the
+                # ones after it onto the next line
+                self._flow(max(number - 1, 0), [], number + 1)
+                return
+            index -= len(entries)
+
+    def _measure(self, t: Tuple) -> Tuple[int, str]:
+        '''Return calc(t) and bold(t), converting the item only once.'''
+        s1, s2 = str(t[0]), str(t[1])
+        width = len(s1) + len(self.sep) + len(s2) + len(self.padding)
+        return width, '%s%s%s%s%s%s' % (self.BOLD, s1, self.OFF, self.sep,
+                                        s2, self.padding)
+
+    def _entry(self, item: Tuple) -> _Entry:
+        width, text = self._measure(item)
+        return (item, width, text)
+
+    def _line(self, entries: List[_Entry]) -> _Line:
+        return (entries,
+                self.new_line + ''.join(entry[2] for entry in entries),
+                len(self.new_line) + sum(entry[1] for entry in entries))
+
+    def _key(self) -> Tuple:
+        return (self.sep, self.padding, self.new_line, self.width)
+
+    def _layout_is_current(self) -> bool:
+        return self._layout_key == self._key()
+
+    def _layout(self) -> List[_Line]:
+        if not self._layout_is_current():
+            self._layout_key = self._key()
+            self._lines = []
+            self._flow(0, [self._entry(item) for item in self._lp], 0)
+        return self._lines
+
+    def _flow(self, start: int, head: List[_Entry], resync: int) -> None:
+        """ Lay out `head` followed by the cached lines from `start` on.
+
+            Lines before `start` are left alone.  Once a new line starts
+            with the first item of a cached line numbered `resync` or later,
+            that line and the rest are kept as they are.
+        """
+        lines = self._lines
+        indent = len(self.new_line)
+        flowed: List[_Line] = []
+        pending = deque(head)
+        current: List[_Entry] = []
+        length = indent
+        following = start
+        while True:
+            starts_line = False
+            if not pending:
+                while following < len(lines) and not lines[following][0]:
+                    following += 1
+                if following == len(lines):
+                    break
+                pending.extend(lines[following][0])
+                following += 1
+                starts_line = following - 1 >= resync
+            entry = pending.popleft()
+            # only the very first line can be closed before it has an item
+            if length + entry[1] > self.width and \
+                    (current or (start == 0 and not flowed)):
+                flowed.append(self._line(current))
+                if starts_line:
+                    lines[start:following - 1] = flowed
+                    return
+                current = [entry]
+                length = indent + entry[1]
             else:
-                line += self.bold(i)
-                line_length += self.calc(i)
-        _str = _str + '\n' + line
-        return _str
+                current.append(entry)
+                length += entry[1]
+        if current:
+            flowed.append(self._line(current))
+        lines[start:following] = flowed
+
+    def iter_lines(self) -> Iterator[str]:
+        '''
+        Yield the packed lines one at a time; joined with newlines they
+        make up str(self).
+        '''
+        lines = self._layout()
+        if not lines:
+            yield ''
+            yield self.new_line
+            return
+        closed = [line[1] for line in lines[:-1]]
+        # like the old concatenation, drop an empty first line
+        if closed and closed[0] == '':
+            del closed[0]
+        if not closed:
+            yield ''
+        for text in closed:
+            yield text
+        yield lines[-1][1]
+
+    def render(self, file: Output) -> None:
+        '''Write str(self) to `file` a line at a time.'''
+        lines = self.iter_lines()
+        file.write(next(lines))
+        for line in lines:
+            file.write('\n')
+            file.write(line)
+
+    def __str__(self) -> str:
+        return '\n'.join(self.iter_lines())
@@ -0,0 +1,107 @@
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+from typing import (Any, Callable, Iterable, Iterator, List, Optional,
+                    Sequence, Tuple)
+
+
+class ChoiceProvider(object):
+
+    '''
+    Choices fetched on demand instead of being held up front.
+
+    `source` is either a callable returning an iterable of choices, which is
+    called again whenever the choices are needed and not cached, or an
+    iterator, which can only be read once.  Nothing is fetched until the
+    choices are first iterated.
+
+    A complete pass over at most `maxsize` choices is kept and reused until
+    clear() is called; larger sources are streamed from `source` every time
+    and never held in memory as a whole.  An iterator is always kept in
+    full, since it can not be read again.  `fetches` counts the passes made
+    over `source`.
+
+    Validators put the choices in their own display order, unless `ordered`
+    is set to say the source already returns them in the order to show.
+    '''
+
+    ordered = False
+
+    def __init__(self, source: Any, maxsize: int = 10000) -> None:
+        self.source = source
+        self.maxsize = maxsize
+        self.fetches = 0
+        self._cache: Optional[List] = None
+
+    def clear(self) -> None:
+        '''Drop the cached choices; validators using them need invalidate().'''
+        self._cache = None
+
+    def _fetch(self) -> Iterable:
+        if callable(self.source):
+            return self.source()
+        if self.fetches:
+            raise ValueError('An iterator of choices can only be read once; '
+                             'provide a callable to fetch them again.')
+        return self.source
+
+    def __iter__(self) -> Iterator:
+        if self._cache is not None:
+            for choice in self._cache:
+                yield choice
+            return
+        choices = self._fetch()
+        self.fetches += 1
+        limit = self.maxsize if callable(self.source) else None
+        cache: Optional[List] = []
+        for choice in choices:
+            if cache is not None:
+                if limit is None or len(cache) < limit:
+                    cache.append(choice)
+                else:
+                    cache = None
+            yield choice
+        # only a complete pass can stand in for the source
+        self._cache = cache
+
+    def select(self, filters: List, table=None) -> Tuple[Iterable, List]:
+        """ Return the choices to scan and the filters left to apply.
+
+            Sources that can apply some filters themselves, e.g. as part of
+            a query, override this to return only the choices those filters
+            keep, and the rest of the filters.
+        """
+        return self, filters
+
+
+def paged(fetch: Callable[[int, int], Sequence],
+          page_size: int = 1000) -> Callable[[], Iterator]:
+    """ Turn a page fetching function into a ChoiceProvider source.
+
+        `fetch(offset, limit)` returns at most `limit` choices starting at
+        `offset`; a short page ends the choices.  Pages are fetched one at
+        a time as the choices are read.
+    """
+    def stream() -> Iterator:
+        offset = 0
+        while True:
+            page = fetch(offset, page_size)
+            for choice in page:
+                yield choice
+            if len(page) < page_size:
+                return
+            offset += len(page)
+    return stream
+
+
+def as_provider(choices: Any) -> Optional[ChoiceProvider]:
+    '''
+    Return `choices` as a ChoiceProvider if they are one, a callable or an
+    iterator, or None if they are a collection to be used as is.
+    '''
+    if isinstance(choices, ChoiceProvider):
+        return choices
+    if callable(choices) or \
+            (hasattr(choices, '__next__') and iter(choices) is choices):
+        return ChoiceProvider(choices)
+    return None
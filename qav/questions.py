@@ -3,22 +3,205 @@
 
 import logging
 
-from typing import Dict, List, Union
-
-from qav.validators import Validator, CompactListValidator
+from collections import ChainMap, OrderedDict
+from contextlib import contextmanager
+from typing import (IO, Any, Callable, Collection, Dict, FrozenSet, Iterable,
+                    Iterator, List, Mapping, MutableMapping, NamedTuple,
+                    Optional, Set, Tuple, Union, cast)
+
+from qav.validators import Validator, CompactListValidator, HashValidator
+from qav.console import Console, get_console
 from qav.listpack import ListPack
+from qav.template import Template
 from qav.utils import bold
 
 logger = logging.getLogger(__name__)
 
+# the code flag set for functions taking *args
+_CO_VARARGS = 0x04
+
+
+def _print_choices(validator: Validator, console: Console) -> bool:
+    """ Print the validator's menu to `console`.
+
+        print_choices() overrides written before it took an output stream
+        are called without one, after the console is flushed so that they
+        still print in order.
+    """
+    code = getattr(type(validator).print_choices, '__code__', None)
+    if code is None or code.co_argcount > 1 or code.co_flags & _CO_VARARGS:
+        return validator.print_choices(console)
+    console.flush()
+    return validator.print_choices()
+
+
+class AnswerError(NamedTuple):
+
+    '''An answer that was missing or did not validate in headless mode.'''
+
+    value: str
+    answer: Any
+    message: str
+
+
+class AnswerResult(NamedTuple):
+
+    '''The answers and errors from answering questions without prompting.'''
+
+    answers: Dict
+    errors: List[AnswerError]
+
+
+class AnswerContext(ChainMap):
+
+    '''
+    The answers a question is asked with: the answers given so far layered
+    over the answers passed in.  Writes only go to the top layer, so the
+    answers passed in are never copied or modified, and validators and
+    filters read straight through the layers.
+    '''
+
+    def __init__(self, given: Dict, *answers: Mapping) -> None:
+        # the layers below `given` are only ever read
+        super(AnswerContext, self).__init__(
+            given, *[cast(MutableMapping, a) for a in answers])
+
+    @property
+    def given(self) -> Dict:
+        '''The answers written to this context.'''
+        return cast(Dict, self.maps[0])
+
+    def materialize(self) -> Dict:
+        '''Return all the answers as a single new dict.'''
+        return dict(self)
+
+
+class Plan(object):
+
+    '''
+    A Question hierarchy flattened into the order its questions are asked.
+
+    Every question is asked with the answers given before it, which is what
+    the recursive ask() did, so running the plan step by step gives the
+    same answers and hints without recursing.  The answers are kept in one
+    AnswerContext for the whole run rather than re-merged for every
+    question.
+    '''
+
+    steps: List['Question']
+
+    def __init__(self, questions: Iterable['Question']) -> None:
+        self.steps = []
+        stack = list(reversed(list(questions)))
+        while stack:
+            question = stack.pop()
+            self.steps.append(question)
+            stack.extend(reversed(question._questions))
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __iter__(self) -> Iterator['Question']:
+        return iter(self.steps)
+
+    def execute(self, answers: Mapping = None) -> 'AnswerContext':
+        """ Ask every question, returning the resulting AnswerContext. """
+        context = AnswerContext({}, {} if answers is None else answers)
+        for question in self.steps:
+            context.update(question._ask_step(context))
+        return context
+
+    async def execute_async(self, answers: Mapping = None) -> 'AnswerContext':
+        """ Like execute(), but without blocking the event loop. """
+        context = AnswerContext({}, {} if answers is None else answers)
+        for question in self.steps:
+            context.update(await question._ask_step_async(context))
+        return context
+
+    def _needs_asking(self, question: 'Question', values: Collection[str],
+                      changed: Set[str]) -> bool:
+        if question.value in values:
+            return True
+        if not changed:
+            return False
+        keys = question.dependencies()
+        return keys is None or not changed.isdisjoint(keys)
+
+    @staticmethod
+    def _record(context: AnswerContext, answers: Mapping, step: Dict,
+                changed: Set[str]) -> None:
+        """ Add a step's answers to `context`, noting in `changed` those
+            that differ from `answers`.
+        """
+        for key, value in step.items():
+            if key not in answers or answers[key] != value:
+                changed.add(key)
+        context.update(step)
+
+    def rerun(self, answers: Mapping, values: Collection[str]) -> 'AnswerContext':
+        """ Ask again only the questions for `values`, plus those whose
+            prompt or validators depend on an answer that changed as a
+            result; every other answer is kept from `answers`.
+        """
+        context = AnswerContext({}, answers)
+        changed: Set[str] = set()
+        for question in self.steps:
+            if self._needs_asking(question, values, changed):
+                self._record(context, answers, question._ask_step(context),
+                             changed)
+        return context
+
+    async def rerun_async(self, answers: Mapping,
+                          values: Collection[str]) -> 'AnswerContext':
+        """ Like rerun(), but without blocking the event loop. """
+        context = AnswerContext({}, answers)
+        changed: Set[str] = set()
+        for question in self.steps:
+            if self._needs_asking(question, values, changed):
+                self._record(context, answers,
+                             await question._ask_step_async(context), changed)
+        return context
+
+    def run(self, answers: Mapping = None) -> Dict:
+        """ Ask every question, returning the answers given. """
+        return self.execute(answers).given
+
+    async def run_async(self, answers: Mapping = None) -> Dict:
+        """ Like run(), but without blocking the event loop. """
+        return (await self.execute_async(answers)).given
+
+    def _answer(self, mapping: Mapping, answers: Mapping = None
+                ) -> Tuple['AnswerContext', List[AnswerError]]:
+        context = AnswerContext({}, {} if answers is None else answers)
+        errors: List[AnswerError] = []
+        for question in self.steps:
+            context.update(question._answer_step(mapping, context, errors))
+        return context, errors
+
+    def answer_from(self, mapping: Mapping,
+                    answers: Mapping = None) -> AnswerResult:
+        """ Answer every question from `mapping` without prompting. """
+        context, errors = self._answer(mapping, answers)
+        return AnswerResult(context.given, errors)
+
 
 class QuestionSet(object):
     answers: Dict
     questions: List
+    console: Optional[Console]
+
+    def __init__(self, stdin: IO[str] = None, stdout: IO[str] = None) -> None:
+        """ A set of questions asked one after the other.
 
-    def __init__(self) -> None:
+            Given `stdin` or `stdout`, every question is asked over those
+            streams instead of its own.
+        """
         self.answers = {}
         self.questions = []
+        if stdin is None and stdout is None:
+            self.console = None
+        else:
+            self.console = Console(stdin, stdout)
 
     def add(self, question: str) -> 'QuestionSet':
         self.questions.append(question)
@@ -28,53 +211,210 @@ class QuestionSet(object):
         self.questions.remove(question)
         return self
 
-    def ask(self) -> Dict:
-        for question in self.questions:
-            self.answers = dict(self.answers, **question.ask(self.answers))
+    def compile(self) -> Plan:
+        """ Flatten the questions and their sub-questions into a Plan. """
+        return Plan(self.questions)
+
+    @contextmanager
+    def _lend_console(self, plan: Plan) -> Iterator[None]:
+        """ Ask the plan's questions over this set's console, if it has
+            one, giving the questions their own consoles back afterwards.
+        """
+        if self.console is None:
+            yield
+            return
+        owned = [(question, question.console) for question in plan]
+        for question, console in owned:
+            question.console = self.console
+        try:
+            yield
+        finally:
+            for question, console in owned:
+                question.console = console
+
+    def _console(self) -> Console:
+        if self.console is not None:
+            return self.console
+        return get_console()
+
+    def _keep(self, context: AnswerContext) -> Dict:
+        self.answers = context.materialize()
         return self.answers
 
+    def ask(self) -> Dict:
+        plan = self.compile()
+        with self._lend_console(plan):
+            context = plan.execute(self.answers)
+        return self._keep(context)
+
+    def answer_from(self, mapping: Mapping) -> AnswerResult:
+        """ Answer the questions from a mapping instead of prompting.
+
+            Each question, including sub-questions, takes its answer from
+            `mapping[question.value]`, falling back to the default the
+            interactive prompt would offer.  Answers go through the same
+            validators and hints as ask(), but nothing is printed and
+            self.answers is left untouched.
+        """
+        return self._answer_from(self.compile(), mapping)
+
+    def _answer_from(self, plan: Plan, mapping: Mapping) -> AnswerResult:
+        context, errors = plan._answer(mapping, self.answers)
+        return AnswerResult(context.materialize(), errors)
+
+    def answer_all(self, mappings: Iterable[Mapping]) -> Iterator[AnswerResult]:
+        """ Answer the questions once for every mapping in `mappings`. """
+        plan = self.compile()
+        for mapping in mappings:
+            yield self._answer_from(plan, mapping)
+
+    async def ask_async(self) -> Dict:
+        """ Like ask(), but prompts and validates without blocking. """
+        plan = self.compile()
+        with self._lend_console(plan):
+            context = await plan.execute_async(self.answers)
+        return self._keep(context)
+
+    def _confirm_question(self) -> 'Question':
+        question = Question('Are these answers correct? ' +
+                            '[yes/abort/retry]', value='confirm',
+                            validator=CompactListValidator(
+                                choices=['yes', 'abort', 'retry']))
+        question.console = self._console()
+        return question
+
+    def _summary(self, answers: Dict, additional_readonly_items: List = None,
+                 prepend_listpacking_items: bool = True) -> ListPack:
+        lp = ListPack(
+            [(q.printable_name, answers[q.value]) for q in self.questions])
+
+        # add in items that were not asked as questions but should be
+        # displayed alongside that information
+        if additional_readonly_items:
+            if prepend_listpacking_items:
+                for item in additional_readonly_items:
+                    lp.prepend_item(item)
+            else:
+                for item in additional_readonly_items:
+                    lp.append_item(item)
+        return lp
+
+    def _show_summary(self, summary: ListPack) -> None:
+        console = self._console()
+        summary.render(console)
+        console.writeline()
+
+    def _update_summary(self, summary: ListPack, previous: Mapping,
+                        answers: Mapping, prepended: bool) -> None:
+        """ Put the answers that differ from `previous` into `summary` in
+            place, so only the lines holding them are laid out again.
+        """
+        offset = len(summary) - len(self.questions) if prepended else 0
+        for position, q in enumerate(self.questions, offset):
+            if answers[q.value] != previous[q.value]:
+                summary.set_item(position,
+                                 (q.printable_name, answers[q.value]))
+
+    @staticmethod
+    def _names(plan: Plan) -> Mapping:
+        """ Map the printable names of the plan's questions to their
+            answer keys.
+        """
+        return OrderedDict((q.printable_name, q.value) for q in plan)
+
+    def _change_question(self, names: Mapping) -> 'Question':
+        question = Question('Which answers would you like to change?',
+                            value='change', multiple=True,
+                            validator=HashValidator(names, verbose=False))
+        question.console = self._console()
+        return question
+
+    @staticmethod
+    def _to_change(names: Mapping, change_answer: Dict) -> List[str]:
+        return [names[name] for name in change_answer['change']]
+
     def ask_and_confirm(self, additional_readonly_items: List = None,
-                        prepend_listpacking_items: bool = True) -> Union[Dict, None]:
-        confirm_question = Question('Are these answers correct? ' +
-                                    '[yes/abort/retry]', value='confirm',
-                                    validator=CompactListValidator(
-                                        choices=['yes', 'abort', 'retry']))
+                        prepend_listpacking_items: bool = True,
+                        incremental_retry: bool = False) -> Union[Dict, None]:
+        """ Ask the questions, then ask for the answers to be confirmed.
+
+            On "retry" every question is asked again, unless
+            `incremental_retry` is set.  Then the operator picks the answers
+            to change, and only those questions and the ones whose prompt or
+            validators depend on an answer that changed are asked again.
+        """
+        confirm_question = self._confirm_question()
+        plan = self.compile()
+        answers = self.ask()
+        summary = self._summary(answers, additional_readonly_items,
+                                prepend_listpacking_items)
 
         while True:
-            answers = self.ask()
-            lp = ListPack(
-                [(q.printable_name, answers[q.value]) for q in self.questions])
-
-            # add in items that were not asked as questions but should be
-            # displayed alongside that information
-            if additional_readonly_items:
-                if prepend_listpacking_items:
-                    for item in additional_readonly_items:
-                        lp.prepend_item(item)
-                else:
-                    for item in additional_readonly_items:
-                        lp.append_item(item)
-
-            print(lp)
-            confirm_answer = confirm_question.ask()
-            if confirm_answer['confirm'] == 'yes':
-                return answers
-            if confirm_answer['confirm'] != 'retry':
-                return None
+            self._show_summary(summary)
+            confirm = confirm_question.ask()['confirm']
+            if confirm != 'retry':
+                return answers if confirm == 'yes' else None
+            previous = answers
+            if incremental_retry:
+                names = self._names(plan)
+                change_answer = self._change_question(names).ask()
+                with self._lend_console(plan):
+                    context = plan.rerun(
+                        self.answers, self._to_change(names, change_answer))
+                answers = self._keep(context)
+            else:
+                answers = self.ask()
+            self._update_summary(summary, previous, answers,
+                                 prepend_listpacking_items)
+
+    async def ask_and_confirm_async(
+            self, additional_readonly_items: List = None,
+            prepend_listpacking_items: bool = True,
+            incremental_retry: bool = False) -> Union[Dict, None]:
+        """ Like ask_and_confirm(), but without blocking. """
+        confirm_question = self._confirm_question()
+        plan = self.compile()
+        answers = await self.ask_async()
+        summary = self._summary(answers, additional_readonly_items,
+                                prepend_listpacking_items)
+
+        while True:
+            self._show_summary(summary)
+            confirm = (await confirm_question.ask_async())['confirm']
+            if confirm != 'retry':
+                return answers if confirm == 'yes' else None
+            previous = answers
+            if incremental_retry:
+                names = self._names(plan)
+                change_answer = await self._change_question(names).ask_async()
+                with self._lend_console(plan):
+                    context = await plan.rerun_async(
+                        self.answers, self._to_change(names, change_answer))
+                answers = self._keep(context)
+            else:
+                answers = await self.ask_async()
+            self._update_summary(summary, previous, answers,
+                                 prepend_listpacking_items)
 
 
 class Question(object):
-    _answers: Dict
+    __slots__ = ('template', 'value', 'multiple', 'printable_name',
+                 'validator', 'console', '_questions', '_input_override')
+
     _questions: List
+    template: Template
+    console: Console
 
     def __init__(self, question: str, value: str, validator: 'Validator' = None,
-                 multiple=False, printable_name=None) -> None:
+                 multiple=False, printable_name=None, stdin: IO[str] = None,
+                 stdout: IO[str] = None) -> None:
         """ Basic Question class.
 
             Supports simple question and answer or question and multiple
             answers (note: list/hash validators have caveats).  Also
             support for one or more Validator classes to ensure the answer
-            given meets the question criteria.
+            given meets the question criteria.  The question is asked over
+            `stdin` and `stdout`, by default those of the process.
         """
         self.question = question
         self.value = value
@@ -87,8 +427,40 @@ class Question(object):
             self.validator = Validator()
         else:
             self.validator = validator
+        if stdin is None and stdout is None:
+            self.console = get_console()
+        else:
+            self.console = Console(stdin, stdout)
+        self._input_override: Optional[Callable[[str], str]] = None
         self._questions = []
 
+    @property
+    def question(self) -> str:
+        return self.template.template
+
+    @question.setter
+    def question(self, question: str) -> None:
+        self.template = Template(question)
+
+    @property
+    def prompt_dependencies(self) -> FrozenSet[str]:
+        """ The answer keys the question's prompt refers to. """
+        return self.template.keys
+
+    def dependencies(self) -> Optional[FrozenSet[str]]:
+        """ The answer keys this question's prompt and validators depend
+            on, or None if that can not be told.
+        """
+        if self.template.opaque:
+            return None
+        keys = set(self.template.keys)
+        for v in self._validators():
+            validator_keys = v.dependencies()
+            if validator_keys is None:
+                return None
+            keys.update(validator_keys)
+        return frozenset(keys)
+
     def __eq__(self, other: 'Question') -> bool:  # type: ignore
         if self.question == other.question and self.value == other.value:
             return True
@@ -98,10 +470,43 @@ class Question(object):
     def __repr__(self) -> str:
         return self.value
 
-    def _get_input(self, text) -> str:
-        return input(text)
+    def _prompt(self, text: str) -> str:
+        return self.console.prompt(text)
+
+    @property
+    def _get_input(self) -> Callable[[str], str]:
+        """ The function reading an answer, given the prompt text.
 
-    def _ask(self, answers: Dict) -> Union[Dict, None]:
+            Assign a function to it to read answers some other way, or
+            override it in a subclass as a method.
+        """
+        if self._input_override is not None:
+            return self._input_override
+        return self._prompt
+
+    @_get_input.setter
+    def _get_input(self, func: Optional[Callable[[str], str]]) -> None:
+        if func == self._prompt:
+            # e.g. monkeypatch putting the original back
+            func = None
+        self._input_override = func
+
+    async def _get_input_async(self, text) -> str:
+        """ Read an answer without blocking the event loop.
+
+            By default the answer is read through the console's
+            prompt_async(), which lets concurrent questions take turns.  A
+            replacement _get_input() is run in the loop's default executor
+            instead.  Override this to read from a non-blocking source.
+        """
+        get_input = self._get_input
+        if get_input == self._prompt:
+            return await self.console.prompt_async(text)
+        import asyncio
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, get_input, text)
+
+    def _ask(self, answers: Mapping) -> Union[Dict, None]:
         """ Really ask the question.
 
             We may need to populate multiple validators with answers here.
@@ -109,24 +514,12 @@ class Question(object):
             appropriate.  Finally call the validate function to check all
             validators for this question and returning the answer.
         """
-        if isinstance(self.validator, list):
-            for v in self.validator:
-                v.answers = answers
-        else:
-            self.validator.answers = answers
+        q = self._begin_ask(answers)
         while(True):
-            q = self.question % answers
-
-            if not self.choices():
-                logger.warning('No choices were supplied for "%s"' % q)
+            text = self._prompt_text(q, answers)
+            if text is None:
                 return None
-            if self.value in answers:
-                default = Validator.stringify(answers[self.value])
-                answer = self._get_input("%s [%s]: " % (q, default))
-                if answer == '':
-                    answer = answers[self.value]
-            else:
-                answer = self._get_input("%s: " % q)
+            answer = self._or_default(self._get_input(text), answers)
             # if we are in multiple mode and the answer is just the empty
             # string (enter/return pressed) then we will just answer None
             # to indicate we are done
@@ -135,12 +528,67 @@ class Question(object):
             if self.validate(answer):
                 return self.answer()
             else:
-                if isinstance(self.validator, list):
-                    for v in self.validator:
-                        if v.error() != '':
-                            print(v.error())
-                else:
-                    print(self.validator.error())
+                self._print_errors()
+
+    def _begin_ask(self, answers: Mapping) -> str:
+        """ Give the validators the answers so far and return the rendered
+            question.
+        """
+        for v in self._validators():
+            v.answers = answers
+        return self.template.render(answers)
+
+    def _prompt_text(self, q: str, answers: Mapping) -> Optional[str]:
+        """ Show the choices and return the prompt to read the answer
+            with, or None if there is nothing to choose from.
+        """
+        if not self.choices():
+            logger.warning('No choices were supplied for "%s"' % q)
+            return None
+        if self.value in answers:
+            default = Validator.stringify(answers[self.value])
+            text = "%s [%s]: " % (q, default)
+        else:
+            text = "%s: " % q
+        # a replaced _get_input() does not show the console's output
+        self.console.flush()
+        return text
+
+    def _or_default(self, answer: Any, answers: Mapping) -> Any:
+        """ Return the default for an empty answer, if there is one. """
+        if answer == '' and self.value in answers:
+            return answers[self.value]
+        return answer
+
+    def _print_errors(self) -> None:
+        if isinstance(self.validator, list):
+            for v in self.validator:
+                if v.error() != '':
+                    self.console.writeline(v.error())
+        elif self.validator.error() != '':
+            self.console.writeline(self.validator.error())
+
+    async def _ask_async(self, answers: Mapping) -> Union[Dict, None]:
+        """ Like _ask(), but reads and validates the answer without
+            blocking the event loop.
+        """
+        q = self._begin_ask(answers)
+        while True:
+            text = self._prompt_text(q, answers)
+            if text is None:
+                return None
+            answer = self._or_default(await self._get_input_async(text),
+                                      answers)
+            if answer == '.' and self.multiple:
+                return None
+            if await self.validate_async(answer):
+                return self.answer()
+            else:
+                self._print_errors()
+
+    def compile(self) -> Plan:
+        """ Flatten this question and its sub-questions into a Plan. """
+        return Plan([self])
 
     def ask(self, answers: Dict = None) -> Dict:
         """ Ask the question, then ask any sub-questions.
@@ -148,29 +596,114 @@ class Question(object):
             This returns a dict with the {value: answer} pairs for the current
             question plus all descendant questions.
         """
-        if answers is None:
-            answers = {}
-        _answers: Dict = {}
+        return self.compile().run(answers)
+
+    async def ask_async(self, answers: Dict = None) -> Dict:
+        """ Like ask(), but without blocking the event loop. """
+        return await self.compile().run_async(answers)
+
+    def answer_from(self, mapping: Mapping, answers: Dict = None) -> AnswerResult:
+        """ Answer the question and sub-questions from a mapping.
+
+            This is the non-interactive counterpart to ask(); see
+            QuestionSet.answer_from().
+        """
+        return self.compile().answer_from(mapping, answers)
+
+    def _ask_step(self, answers: Mapping) -> Dict:
+        """ Ask just this question, returning its answer and hints. """
+        _answers = self._begin_step()
         if self.multiple:
-            print((bold('Multiple answers are supported for this question.  ' +
-                        'Please enter a "."  character to finish.')))
-            _answers[self.value] = []
             answer = self._ask(answers)
             while answer is not None:
                 _answers[self.value].append(answer)
                 answer = self._ask(answers)
         else:
             _answers[self.value] = self._ask(answers)
-        if isinstance(self.validator, list):
-            for v in self.validator:
-                _answers = dict(_answers, **v.hints())
+        return self._end_step(_answers)
+
+    async def _ask_step_async(self, answers: Mapping) -> Dict:
+        _answers = self._begin_step()
+        if self.multiple:
+            answer = await self._ask_async(answers)
+            while answer is not None:
+                _answers[self.value].append(answer)
+                answer = await self._ask_async(answers)
         else:
-            _answers = dict(_answers, **self.validator.hints())
-        for q in self._questions:
-            answers = dict(answers, **_answers)
-            _answers = dict(_answers, **q.ask(answers))
+            _answers[self.value] = await self._ask_async(answers)
+        return self._end_step(_answers)
+
+    def _begin_step(self) -> Dict:
+        """ Get ready to ask the question, returning its empty answers. """
+        for v in self._validators():
+            v.reset_menu()
+        _answers: Dict = {}
+        if self.multiple:
+            self.console.writeline(
+                bold('Multiple answers are supported for this question.  ' +
+                     'Please enter a "."  character to finish.'))
+            _answers[self.value] = []
         return _answers
 
+    def _end_step(self, _answers: Dict) -> Dict:
+        """ Add the validators' hints to the answers given. """
+        for v in self._validators():
+            _answers.update(v.hints())
+        # anything printed after the last prompt
+        self.console.flush()
+        return _answers
+
+    def _answer_step(self, mapping: Mapping, answers: Mapping,
+                     errors: List[AnswerError]) -> Dict:
+        """ Answer just this question from `mapping`. """
+        validators = self._validators()
+        for v in validators:
+            v.answers = answers
+        _answers: Dict = {}
+        if not validators[0].has_choices():
+            _answers[self.value] = [] if self.multiple else None
+        elif self.value in mapping or self.value in answers:
+            # like pressing enter at the prompt, '' takes the default
+            given = self._or_default(mapping.get(self.value, ''), answers)
+            if self.multiple:
+                if not isinstance(given, (list, tuple)):
+                    given = [given]
+                _answers[self.value] = []
+                for g in given:
+                    if self._answer_one(g, validators, errors):
+                        _answers[self.value].append(self.answer())
+            elif self._answer_one(given, validators, errors):
+                _answers[self.value] = self.answer()
+            else:
+                _answers[self.value] = None
+        else:
+            _answers[self.value] = [] if self.multiple else None
+            errors.append(AnswerError(self.value, None,
+                                      'No answer was given.'))
+        for v in validators:
+            _answers.update(v.hints())
+        return _answers
+
+    def _answer_one(self, given: Any, validators: List,
+                    errors: List[AnswerError]) -> bool:
+        for v in validators:
+            v.error_message = None
+        if self.validate(given):
+            return True
+        for v in validators:
+            if v.error_message:
+                message = v.error_message
+                break
+        else:
+            message = '%s is not a valid answer.' % given
+        errors.append(AnswerError(self.value, given, message))
+        return False
+
+    def _validators(self) -> List:
+        if isinstance(self.validator, list):
+            return self.validator
+        return [self.validator]
+
     def validate(self, answer: str) -> bool:
         """ Validate the answer with our Validator(s)
 
@@ -189,6 +722,15 @@ class Question(object):
             else:
                 return self.validator.validate(answer)
 
+    async def validate_async(self, answer: str) -> bool:
+        """ Like validate(), but awaits each validator's validate_async() """
+        if answer is None:
+            return False
+        for v in self._validators():
+            if not await v.validate_async(answer):
+                return False
+        return True
+
     def answer(self) -> Dict:
         """ Return the answer for the question from the validator.
 
@@ -206,8 +748,8 @@ class Question(object):
             we will only show the first validator's choices.
         """
         if isinstance(self.validator, list):
-            return self.validator[0].print_choices()
-        return self.validator.print_choices()
+            return _print_choices(self.validator[0], self.console)
+        return _print_choices(self.validator, self.console)
 
     def add(self, question: 'Question') -> None:
         if isinstance(question, Question):
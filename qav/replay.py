@@ -0,0 +1,69 @@
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+import json
+
+from typing import Dict, IO, Iterator, List, NamedTuple, Optional, Union
+
+from qav.questions import AnswerError, Question, QuestionSet
+
+
+class ReplayResult(NamedTuple):
+
+    '''
+    The outcome of replaying one record.  `line` is the 1-based line number
+    of the record in its file.  `answers` is None if the line could not be
+    read as a record at all.
+    '''
+
+    line: int
+    answers: Optional[Dict]
+    errors: List[AnswerError]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def replay(questions: Union[Question, QuestionSet],
+           lines: Iterator[str]) -> Iterator[ReplayResult]:
+    """ Replay JSON answer records, one per line, through `questions`.
+
+        Each non-blank line must hold a JSON object mapping question values
+        to answers.  Records are read, answered with answer_from() and
+        yielded one at a time, so only a single record is held in memory
+        and nothing is read ahead of the consumer.  The questions are
+        compiled once, and the same plan, and so the same validators and
+        their caches, is reused for every record.
+    """
+    plan = questions.compile()
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield ReplayResult(number, None, [
+                AnswerError('', line.rstrip('\n'), 'Invalid JSON: %s' % e)])
+            continue
+        if not isinstance(record, dict):
+            yield ReplayResult(number, None, [
+                AnswerError('', record, 'Record is not a JSON object.')])
+            continue
+        if isinstance(questions, QuestionSet):
+            result = questions._answer_from(plan, record)
+        else:
+            result = plan.answer_from(record)
+        yield ReplayResult(number, result.answers, result.errors)
+
+
+def replay_jsonl(questions: Union[Question, QuestionSet],
+                 source: Union[str, IO[str]]) -> Iterator[ReplayResult]:
+    """ Replay a JSONL file, given as a path or an open text file. """
+    if isinstance(source, str):
+        with open(source, encoding='utf-8') as f:
+            for result in replay(questions, f):
+                yield result
+    else:
+        for result in replay(questions, source):
+            yield result
@@ -0,0 +1,212 @@
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+import socket
+import threading
+import time
+
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class Resolver(object):
+
+    '''
+    Forward and reverse name lookups through the socket library.
+
+    Anything with the same two methods, raising the same exceptions, can be
+    used in its place, e.g. a local stand-in for tests.
+    '''
+
+    def gethostbyname(self, name: str) -> str:
+        return socket.gethostbyname(name)
+
+    def gethostbyaddr(self, address: str) -> Tuple:
+        return socket.gethostbyaddr(address)
+
+
+class CachingResolver(object):
+
+    '''
+    Caches the results of another resolver for `ttl` seconds.
+
+    Failed lookups are cached as well, for `negative_ttl` seconds, and raise
+    the same kind of exception again while cached.  At most `maxsize`
+    forward and `maxsize` reverse results are kept; the least recently used
+    ones are dropped first.  `hits` and `misses` count cache use.
+    '''
+
+    def __init__(self, resolver: Any = None, ttl: float = 300.0,
+                 negative_ttl: float = 30.0, maxsize: int = 4096,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if resolver is None:
+            resolver = Resolver()
+        self.resolver = resolver
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._forward: OrderedDict = OrderedDict()
+        self._reverse: OrderedDict = OrderedDict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._forward.clear()
+            self._reverse.clear()
+
+    def _lookup(self, cache: OrderedDict, lookup: Callable, key: str) -> Any:
+        now = self.clock()
+        with self._lock:
+            entry = cache.get(key)
+            if entry is not None and entry[0] > now:
+                cache.move_to_end(key)
+                self.hits += 1
+                expires, ok, result = entry
+                if ok:
+                    return result
+                raise type(result)(*result.args)
+            self.misses += 1
+        try:
+            result = lookup(key)
+        except (socket.gaierror, socket.herror) as e:
+            ok, result, expires = False, e, now + self.negative_ttl
+        else:
+            ok, expires = True, now + self.ttl
+        with self._lock:
+            cache[key] = (expires, ok, result)
+            cache.move_to_end(key)
+            while len(cache) > self.maxsize:
+                cache.popitem(last=False)
+        if not ok:
+            raise result
+        return result
+
+    def gethostbyname(self, name: str) -> str:
+        return self._lookup(self._forward, self.resolver.gethostbyname, name)
+
+    def gethostbyaddr(self, address: str) -> Tuple:
+        return self._lookup(self._reverse, self.resolver.gethostbyaddr,
+                            address)
+
+
+_resolver: Any = CachingResolver()
+
+
+def get_resolver() -> Any:
+    '''Return the process-wide resolver used by DomainNameValidator.'''
+    return _resolver
+
+
+def set_resolver(resolver: Any) -> None:
+    '''Replace the process-wide resolver used by DomainNameValidator.'''
+    global _resolver
+    _resolver = resolver
+
+
+class Resolution(NamedTuple):
+
+    '''
+    The forward and reverse lookups of one name by resolve_many().
+
+    `address` is the forward result and `hostname` the reverse result; each
+    is None if that lookup failed, timed out or was not attempted.  `error`
+    describes the first failure.
+    '''
+
+    name: str
+    address: Optional[str]
+    hostname: Optional[str]
+    error: Optional[str]
+
+
+class _Lookup(object):
+
+    '''A lookup that remembers when a worker thread started running it.'''
+
+    def __init__(self, func: Callable, arg: str) -> None:
+        self.func = func
+        self.arg = arg
+        self.started: Optional[float] = None
+
+    def __call__(self) -> Any:
+        self.started = time.monotonic()
+        return self.func(self.arg)
+
+
+def resolve_many(names: Iterable[str], resolver: Any = None,
+                 timeout: float = 5.0,
+                 max_workers: int = 32) -> List[Resolution]:
+    """ Forward and reverse resolve many names concurrently.
+
+        Lookups run on a pool of at most `max_workers` threads.  A name's
+        reverse lookup starts as soon as its forward lookup succeeds.  Each
+        lookup may run for `timeout` seconds before it is given up on; a
+        lookup that is stuck in the resolver keeps its thread until it
+        returns, but does not hold up the results.
+    """
+    if resolver is None:
+        resolver = get_resolver()
+    names = list(names)
+    addresses: List[Optional[str]] = [None] * len(names)
+    hostnames: List[Optional[str]] = [None] * len(names)
+    errors: List[Optional[str]] = [None] * len(names)
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    pending: Dict[Future, Tuple[int, bool, _Lookup]] = {}
+
+    def submit(i: int, forward: bool, arg: str) -> None:
+        if forward:
+            lookup = _Lookup(resolver.gethostbyname, arg)
+        else:
+            lookup = _Lookup(resolver.gethostbyaddr, arg)
+        pending[pool.submit(lookup)] = (i, forward, lookup)
+
+    try:
+        for i in range(len(names)):
+            submit(i, True, names[i])
+        while pending:
+            started = [lookup.started for i, forward, lookup
+                       in pending.values() if lookup.started is not None]
+            # lookups that have not started yet may start at any moment, so
+            # never wait longer than a timeout before checking again
+            wait_for = timeout
+            if started:
+                wait_for = max(0.0, min(started) + timeout - time.monotonic())
+            done, _ = wait(list(pending), timeout=wait_for,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                i, forward, lookup = pending.pop(future)
+                try:
+                    result = future.result()
+                except (OSError, UnicodeError):
+                    if forward:
+                        errors[i] = '%s does not resolve.' % names[i]
+                    else:
+                        errors[i] = \
+                            '%s reverse address (%s) does not resolve.' % \
+                            (names[i], addresses[i])
+                    continue
+                if forward:
+                    addresses[i] = result
+                    submit(i, False, result)
+                else:
+                    hostnames[i] = result[0]
+            now = time.monotonic()
+            for future, (i, forward, lookup) in list(pending.items()):
+                if lookup.started is not None and \
+                        lookup.started + timeout <= now:
+                    del pending[future]
+                    if forward:
+                        errors[i] = '%s lookup timed out.' % names[i]
+                    else:
+                        errors[i] = \
+                            '%s reverse lookup (%s) timed out.' % \
+                            (names[i], addresses[i])
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+    return [Resolution(*r) for r in zip(names, addresses, hostnames, errors)]
@@ -0,0 +1,147 @@
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+import sqlite3
+import threading
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .providers import ChoiceProvider
+
+# file name: (shared connection, the lock its cursors are used under)
+_connections: Dict[str, Tuple[sqlite3.Connection, Any]] = {}
+_connections_lock = threading.Lock()
+# rows fetched from a cursor at a time
+_BATCH = 256
+
+
+def connect(database: str) -> sqlite3.Connection:
+    """ Return the shared connection to the SQLite file `database`.
+
+        Every SQLiteChoices reading the same file, e.g. all the questions
+        of a QuestionSet, goes through one connection.
+    """
+    return _shared(database)[0]
+
+
+def _shared(database: str) -> Tuple[sqlite3.Connection, Any]:
+    with _connections_lock:
+        shared = _connections.get(database)
+        if shared is None:
+            # the connection can be used from other threads, e.g. by
+            # questions asked from an executor, but only under the lock
+            shared = (sqlite3.connect(database, check_same_thread=False),
+                      threading.Lock())
+            _connections[database] = shared
+        return shared
+
+
+def close_all() -> None:
+    '''Close the shared connections opened by connect().'''
+    with _connections_lock:
+        for connection, lock in _connections.values():
+            connection.close()
+        _connections.clear()
+
+
+def _quote(identifier: str) -> str:
+    return '"%s"' % identifier.replace('"', '""')
+
+
+class SQLiteChoices(ChoiceProvider):
+
+    '''
+    Choices read from a column of an SQLite table or view.
+
+    With only `column`, the choices are its values, for a ListValidator.
+    With `value_column` as well, they are (column, value_column) pairs, for
+    a HashValidator, whose filters look at the value.  Rows are returned in
+    `order_by` order, `column` by default.
+
+    `database` is a file name, opened once through connect() and shared, or
+    an open sqlite3.Connection.  No query is made until the choices are
+    needed.  Filters that can be expressed in SQL, PreFilter, PostFilter and
+    SubFilter, become the WHERE clause of a single query; an index on the
+    filtered column serves PreFilters.  Any other filters are applied to
+    the rows as they stream in.  Unfiltered passes are cached like any
+    ChoiceProvider's; filtered queries are not.
+
+    The rows are `ordered`, so validators show them in query order rather
+    than sorting them again.  Rows are fetched in batches under a lock:
+    the shared connection's, or this object's own for a connection passed
+    in.
+    '''
+
+    ordered = True
+
+    def __init__(self, database: Union[str, sqlite3.Connection], table: str,
+                 column: str, value_column: Optional[str] = None,
+                 order_by: Optional[str] = None,
+                 maxsize: int = 10000) -> None:
+        super(SQLiteChoices, self).__init__(self._all, maxsize)
+        self.database = database
+        self.table = table
+        self.column = column
+        self.value_column = value_column
+        self.order_by = order_by or column
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        return self._connection_and_lock()[0]
+
+    def _connection_and_lock(self) -> Tuple[sqlite3.Connection, Any]:
+        if isinstance(self.database, sqlite3.Connection):
+            return self.database, self._lock
+        return _shared(self.database)
+
+    def _query(self, where: List[str], params: List) -> Iterator:
+        columns = _quote(self.column)
+        if self.value_column is not None:
+            columns += ', ' + _quote(self.value_column)
+        sql = 'SELECT %s FROM %s' % (columns, _quote(self.table))
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY %s' % _quote(self.order_by)
+        self.queries += 1
+        connection, lock = self._connection_and_lock()
+        with lock:
+            cursor = connection.execute(sql, params)
+        try:
+            while True:
+                # the lock is not held while the rows are consumed
+                with lock:
+                    rows = cursor.fetchmany(_BATCH)
+                if not rows:
+                    return
+                if self.value_column is None:
+                    for row in rows:
+                        yield row[0]
+                else:
+                    for row in rows:
+                        yield row
+        finally:
+            with lock:
+                cursor.close()
+
+    def _all(self) -> Iterator:
+        return self._query([], [])
+
+    def select(self, filters: List, table=None) -> Tuple[Iterable, List]:
+        if self.value_column is None:
+            column = _quote(self.column)
+        else:
+            column = _quote(self.value_column)
+        where: List[str] = []
+        params: List[Any] = []
+        remaining = []
+        for f in filters:
+            predicate = f.predicate(column, table)
+            if predicate is None:
+                remaining.append(f)
+            else:
+                where.append(predicate[0])
+                params.extend(predicate[1])
+        if not where:
+            return self, remaining
+        return self._query(where, params), remaining
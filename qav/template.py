@@ -0,0 +1,50 @@
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+from typing import FrozenSet, Mapping
+
+from qav.utils import LazyRegex
+
+# a single %-style conversion specifier, optionally with a mapping key
+_specifier = LazyRegex(
+    r'%(?:\((?P<key>[^)]*)\))?'
+    r'(?P<spec>[#0\- +]*(?:\*|\d+)?(?:\.(?:\*|\d+))?[hlL]?'
+    r'[diouxXeEfFgGcrsa%])')
+
+
+class Template(object):
+
+    '''
+    A %-style question template, parsed once.
+
+    `keys` is the set of answer keys the template references.  Templates
+    using anything but the mapping keyed form (`%(name)s`), e.g. positional
+    `%s` specifiers, have unknown keys, which is flagged by `opaque`.
+    Either way the template is rendered by the `%` operator, which is
+    faster than putting the parsed parts back together.
+    '''
+
+    __slots__ = ('template', 'opaque', 'keys')
+
+    def __init__(self, template: str) -> None:
+        self.template = template
+        self.opaque = False
+        keys = set()
+        for match in _specifier.compiled().finditer(template):
+            key, spec = match.group('key'), match.group('spec')
+            if spec == '%' and key is None:
+                continue
+            elif key is None or '*' in spec:
+                self.opaque = True
+            else:
+                keys.add(key)
+        # a `%` between specifiers is malformed; leave the error to `%`
+        if _specifier.compiled().sub('', template).count('%'):
+            self.opaque = True
+        self.keys: FrozenSet[str] = frozenset(keys)
+
+    def __repr__(self) -> str:
+        return 'Template(%r)' % self.template
+
+    def render(self, answers: Mapping) -> str:
+        return self.template % answers
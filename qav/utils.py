@@ -1,6 +1,10 @@
 # qav (Question Answer Validation)
 # Copyright (C) 2015 UMIACS
 
+import re
+
+from typing import Any, Optional, Pattern
+
 
 BOLD = '\033[1m'
 OFF = '\033[0m'
@@ -15,3 +19,28 @@ def nonesorter(elem) -> str:
     if not elem:
         return ""
     return elem
+
+
+class LazyRegex(object):
+
+    '''
+    A regular expression that is compiled the first time it is used.
+
+    As a class attribute it reads as the compiled pattern; elsewhere,
+    compiled() returns it.
+    '''
+
+    __slots__ = ('pattern', 'flags', '_compiled')
+
+    def __init__(self, pattern: str, flags: int = 0) -> None:
+        self.pattern = pattern
+        self.flags = flags
+        self._compiled: Optional[Pattern] = None
+
+    def compiled(self) -> Pattern:
+        if self._compiled is None:
+            self._compiled = re.compile(self.pattern, self.flags)
+        return self._compiled
+
+    def __get__(self, obj: Any, owner: Any = None) -> Pattern:
+        return self.compiled()
@@ -4,21 +4,51 @@
 from __future__ import absolute_import
 from __future__ import print_function
 
-from typing import Dict, List, Optional, Any
+from typing import (Any, Callable, Dict, FrozenSet, Iterable, List, Mapping,
+                    NamedTuple, Optional, Sequence, Set, Tuple, cast)
 
+import heapq
 import re
-import socket
-import datetime
+import sys
 import time
 from copy import copy
 
 from collections import OrderedDict
 
-# There aren't type annotations for netaddr yet
-from netaddr import IPAddress  # type: ignore
-from netaddr.core import AddrFormatError  # type: ignore
+from .console import Output
+from .index import ChoiceIndex
+from .providers import ChoiceProvider, as_provider
+from .vectorized import ChoiceVectors
+from .utils import LazyRegex, nonesorter
 
-from .utils import nonesorter
+
+class BatchResult(NamedTuple):
+
+    '''
+    The results of Validator.validate_many(), one entry per value.
+
+    `valid[i]` tells if the i-th value was accepted, `choices[i]` holds the
+    (possibly transformed) accepted value and `errors[i]` the error message
+    for a rejected value.
+    '''
+
+    valid: List[bool]
+    choices: List[Any]
+    errors: List[Optional[str]]
+
+    @classmethod
+    def new(cls) -> 'BatchResult':
+        return cls([], [], [])
+
+    def add(self, choice: Any) -> None:
+        self.valid.append(True)
+        self.choices.append(choice)
+        self.errors.append(None)
+
+    def fail(self, error: str) -> None:
+        self.valid.append(False)
+        self.choices.append(None)
+        self.errors.append(error)
 
 
 class Validator(object):
@@ -32,14 +62,21 @@ class Validator(object):
     validated, and then transformed into a datetime object...
 
     If validation failed, an error message can be set.
+
+    Validators use __slots__ to stay small, since generated question sets
+    can hold tens of thousands of them.  Subclasses that don't declare
+    __slots__ get an instance __dict__ as usual.
     '''
 
+    __slots__ = ('blank', 'negate', '_choice', '_hints', 'answers',
+                 'error_message')
+
     def __init__(self, blank: bool = False, negate: bool = False) -> None:
         self.blank = blank
         self.negate = negate  # TODO this doesn't get used internally..........
         self._choice: Any = None
         self._hints: Dict = {}
-        self.answers: Dict = {}
+        self.answers: Mapping = {}
         self.error_message: Optional[str] = None
 
     def validate(self, value: Any) -> bool:
@@ -53,12 +90,55 @@ class Validator(object):
     def choice(self) -> Any:
         return self._choice
 
-    def print_choices(self) -> bool:
+    async def validate_async(self, value: Any) -> bool:
+        '''
+        Coroutine variant of validate().  Validators that block, e.g. on
+        the network, override it to wait without blocking the event loop.
+        '''
+        return self.validate(value)
+
+    def validate_many(self, values: Iterable) -> BatchResult:
+        '''
+        Validate many values at once, returning a BatchResult.
+
+        Unlike validate(), this leaves the validator's own state alone.
+        Subclasses override it to check values in one tight loop; this
+        fallback runs validate() on a scratch copy of the validator.
+        '''
+        result = BatchResult.new()
+        scratch = copy(self)
+        for value in values:
+            scratch._choice = None
+            scratch.error_message = None
+            if scratch.validate(value):
+                result.add(scratch._choice)
+            else:
+                result.fail(scratch.error_message or
+                            '%s is not a valid value.' % value)
+        return result
+
+    def print_choices(self, out: Output = None) -> bool:
         return True
 
+    def has_choices(self) -> bool:
+        '''Like print_choices(), but without printing anything.'''
+        return True
+
+    def dependencies(self) -> Optional[FrozenSet[str]]:
+        '''
+        Return the answer keys validation depends on, or None if unknown.
+        Validators reading `answers` while validating should override it.
+        '''
+        return frozenset()
+
     def hints(self) -> Dict:
         return self._hints
 
+    def reset_menu(self) -> None:
+        """ Forget any state left by menu commands.  Called before a
+            question using this validator is asked.
+        """
+
     def error(self) -> str:
         if self.error_message is not None:
             return 'ERROR: %s' % self.error_message
@@ -72,6 +152,8 @@ class Validator(object):
 
 class YesNoValidator(Validator):
 
+    __slots__ = ()
+
     def validate(self, value: str) -> bool:
         if value.lower() in ['yes', 'no']:
             self._choice = value.lower()
@@ -88,6 +170,8 @@ class CompactListValidator(Validator):
     validator choices.
     '''
 
+    __slots__ = ('_choices',)
+
     def __init__(self, choices) -> None:
         self._choices = choices
         super(CompactListValidator, self).__init__()
@@ -106,9 +190,12 @@ class DateValidator(Validator):
 
     '''Accepts dates in the format YYYYMMDD'''
 
-    date_regex = re.compile(r'\d{8}')
+    __slots__ = ()
+
+    date_regex = LazyRegex(r'\d{8}')
 
     def validate(self, value: str) -> bool:
+        import datetime
         if self.blank and value == '':
             return True
         if DateValidator.date_regex.match(value):
@@ -122,11 +209,57 @@ class DateValidator(Validator):
         else:
             return False
 
+    def validate_many(self, values: Iterable) -> BatchResult:
+        import datetime
+        result = BatchResult.new()
+        match = DateValidator.date_regex.match
+        strptime = time.strptime
+        for value in values:
+            if self.blank and value == '':
+                result.add(None)
+                continue
+            if match(value):
+                try:
+                    date = strptime(value, "%Y%m%d")
+                except ValueError:
+                    pass
+                else:
+                    result.add(datetime.datetime(*date[:6]))
+                    continue
+            result.fail('%s is not a valid date.' % value)
+        return result
+
 
 class DomainNameValidator(Validator):
 
+    '''
+    Lookups go through `resolver`, or the process-wide caching resolver
+    from qav.resolver if none is given.
+
+    validate_many() resolves its names concurrently on up to
+    `batch_workers` threads, giving up on any single lookup after
+    `batch_timeout` seconds.
+    '''
+
+    __slots__ = ('resolver', 'batch_timeout', 'batch_workers')
+
+    def __init__(self, blank: bool = False, negate: bool = False,
+                 resolver: Any = None) -> None:
+        self.resolver = resolver
+        self.batch_timeout = 5.0
+        self.batch_workers = 32
+        super(DomainNameValidator, self).__init__(blank, negate)
+
+    def _get_resolver(self) -> Any:
+        if self.resolver is not None:
+            return self.resolver
+        # the resolver pulls in socket and concurrent.futures, so it is
+        # only imported once a name is looked up
+        from .resolver import get_resolver
+        return get_resolver()
+
     def validate(self, value: str) -> bool:
-        """Attempts a forward lookup via the socket library and if
+        """Attempts a forward lookup via the resolver and if
            successful will try to do a reverse lookup to verify DNS
            is returning both lookups.
            """
@@ -134,13 +267,43 @@ class DomainNameValidator(Validator):
             self.error_message = '%s is not a fully qualified domain name.' % \
                                  value
             return False
+        import socket
+        resolver = self._get_resolver()
+        try:
+            ipaddress = resolver.gethostbyname(value)
+        except socket.gaierror:
+            self.error_message = '%s does not resolve.' % value
+            return False
+        try:
+            resolver.gethostbyaddr(ipaddress)
+        except socket.herror:
+            self.error_message = \
+                '%s reverse address (%s) does not resolve.' % \
+                (value, ipaddress)
+            return False
+        self._choice = value
+        return True
+
+    async def validate_async(self, value: str) -> bool:
+        """Like validate(), but the lookups run without blocking the event
+           loop."""
+        if '.' not in value:
+            self.error_message = '%s is not a fully qualified domain name.' % \
+                                 value
+            return False
+        import asyncio
+        import socket
+        resolver = self._get_resolver()
+        loop = asyncio.get_event_loop()
         try:
-            ipaddress = socket.gethostbyname(value)
+            ipaddress = await loop.run_in_executor(None, resolver.gethostbyname,
+                                                   value)
         except socket.gaierror:
             self.error_message = '%s does not resolve.' % value
             return False
         try:
-            socket.gethostbyaddr(ipaddress)
+            await loop.run_in_executor(None, resolver.gethostbyaddr,
+                                       ipaddress)
         except socket.herror:
             self.error_message = \
                 '%s reverse address (%s) does not resolve.' % \
@@ -149,10 +312,31 @@ class DomainNameValidator(Validator):
         self._choice = value
         return True
 
+    def validate_many(self, values: Iterable) -> BatchResult:
+        from .resolver import resolve_many
+        values = list(values)
+        fqdns = list(OrderedDict.fromkeys(v for v in values if '.' in v))
+        resolutions = {r.name: r for r in resolve_many(
+            fqdns, self._get_resolver(), timeout=self.batch_timeout,
+            max_workers=self.batch_workers)}
+        result = BatchResult.new()
+        for value in values:
+            resolution = resolutions.get(value)
+            if resolution is None:
+                result.fail('%s is not a fully qualified domain name.' %
+                            value)
+            elif resolution.error is not None:
+                result.fail(resolution.error)
+            else:
+                result.add(value)
+        return result
+
 
 class MacAddressValidator(Validator):
 
-    macaddr_regex = re.compile(r'^([0-9a-f]{2}[:]){5}([0-9a-f]{2})$')
+    __slots__ = ()
+
+    macaddr_regex = LazyRegex(r'^([0-9a-f]{2}[:]){5}([0-9a-f]{2})$')
 
     def validate(self, value: str) -> bool:
         if MacAddressValidator.macaddr_regex.match(value.lower()):
@@ -162,39 +346,170 @@ class MacAddressValidator(Validator):
             self.error_message = '%s is not a valid MAC address.' % value
             return False
 
+    def validate_many(self, values: Iterable) -> BatchResult:
+        result = BatchResult.new()
+        match = MacAddressValidator.macaddr_regex.match
+        for value in values:
+            if match(value.lower()):
+                result.add(value)
+            else:
+                result.fail('%s is not a valid MAC address.' % value)
+        return result
+
+
+_IPAddress: Any = None
+
+
+def _netaddr_ipaddress() -> Any:
+    '''Return netaddr.IPAddress, importing netaddr the first time.'''
+    global _IPAddress
+    if _IPAddress is None:
+        # netaddr is slow to import, so only load it once it is needed;
+        # there aren't type annotations for netaddr yet
+        from netaddr import IPAddress  # type: ignore
+        _IPAddress = IPAddress
+    return _IPAddress
+
+
+_ipaddress: Any = None
+_inet_pton: Any = None
+_AF_INET: Any = None
+
+
+def _load_ipaddress() -> None:
+    '''Import the standard library modules used to parse addresses.'''
+    global _ipaddress, _inet_pton, _AF_INET
+    import ipaddress
+    import socket
+    _inet_pton, _AF_INET = socket.inet_pton, socket.AF_INET
+    _ipaddress = ipaddress
+
+
+def _netmasks(bits: int) -> List[int]:
+    full = (1 << bits) - 1
+    return [full ^ (full >> ones) for ones in range(bits + 1)]
+
+
+# (version, int) of every valid IPv4 and IPv6 netmask
+_NETMASKS = frozenset([(4, mask) for mask in _netmasks(32)] +
+                      [(6, mask) for mask in _netmasks(128)])
+
+
+class _AddressValidator(Validator):
+
+    '''
+    Base class for validators accepting an IP address.
+
+    Addresses are parsed with the standard library's ipaddress module.
+    Unless `use_netaddr` is turned off, choice() and validate_many() still
+    return netaddr.IPAddress objects, converted only when asked for.
+    '''
+
+    __slots__ = ('use_netaddr',)
+
+    def __init__(self, blank: bool = False, negate: bool = False) -> None:
+        self.use_netaddr = True
+        super(_AddressValidator, self).__init__(blank, negate)
+
+    @staticmethod
+    def _parse(value: Any) -> Any:
+        """ Return `value` as an ipaddress address, or None if it is not a
+            valid IP address.
+        """
+        if _ipaddress is None:
+            _load_ipaddress()
+        if isinstance(value, str):
+            # inet_pton is as strict as ipaddress about dotted quads, and
+            # much faster than parsing them in Python
+            try:
+                return _ipaddress.IPv4Address(_inet_pton(_AF_INET, value))
+            except (OSError, ValueError):
+                pass
+        try:
+            address = _ipaddress.ip_address(value)
+        except ValueError:
+            return None
+        # netaddr never accepted scoped IPv6 addresses like fe80::1%eth0
+        if getattr(address, 'scope_id', None):
+            return None
+        return address
+
+    def _converter(self) -> Callable[[Any], Any]:
+        '''Return a function turning parsed addresses into results.'''
+        if not self.use_netaddr:
+            return lambda address: address
+        IPAddress = _netaddr_ipaddress()
+        return lambda address: IPAddress(int(address), address.version)
+
+    def choice(self) -> Any:
+        address = self._choice
+        if address is None or not self.use_netaddr:
+            return address
+        return _netaddr_ipaddress()(int(address), address.version)
+
+
+class IPAddressValidator(_AddressValidator):
 
-class IPAddressValidator(Validator):
+    __slots__ = ()
 
     def validate(self, value: str) -> bool:
         """Return a boolean if the value is valid"""
-        try:
-            self._choice = IPAddress(value)
-            return True
-        except (ValueError, AddrFormatError):
+        address = self._parse(value)
+        if address is None:
             self.error_message = '%s is not a valid IP address.' % value
             return False
+        self._choice = address
+        return True
 
+    def validate_many(self, values: Iterable) -> BatchResult:
+        result = BatchResult.new()
+        parse, convert = self._parse, self._converter()
+        for value in values:
+            address = parse(value)
+            if address is None:
+                result.fail('%s is not a valid IP address.' % value)
+            else:
+                result.add(convert(address))
+        return result
 
-class IPNetmaskValidator(Validator):
+
+class IPNetmaskValidator(_AddressValidator):
+
+    __slots__ = ()
 
     def validate(self, value: str) -> bool:
         """Return a boolean if the value is a valid netmask."""
-        try:
-            self._choice = IPAddress(value)
-        except (ValueError, AddrFormatError):
+        address = self._parse(value)
+        if address is None:
             self.error_message = '%s is not a valid IP address.' % value
             return False
-        if self._choice.is_netmask():
+        self._choice = address
+        if (address.version, int(address)) in _NETMASKS:
             return True
         else:
             self.error_message = '%s is not a valid IP netmask.' % value
             return False
 
+    def validate_many(self, values: Iterable) -> BatchResult:
+        result = BatchResult.new()
+        parse, convert = self._parse, self._converter()
+        for value in values:
+            address = parse(value)
+            if address is None:
+                result.fail('%s is not a valid IP address.' % value)
+            elif (address.version, int(address)) in _NETMASKS:
+                result.add(convert(address))
+            else:
+                result.fail('%s is not a valid IP netmask.' % value)
+        return result
+
 
 class URIValidator(Validator):
 
+    __slots__ = ()
+
     # taken from Django URL validator
-    uri_regex = re.compile(
+    uri_regex = LazyRegex(
         r'^\w+:(?://)?'  # uri scheme
         # domain...
         r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'  # NOQA
@@ -217,7 +532,9 @@ class URIValidator(Validator):
 
 class EmailValidator(Validator):
 
-    email_regex = re.compile(r'[^@]+@[^@]+\.[^@]+')
+    __slots__ = ()
+
+    email_regex = LazyRegex(r'[^@]+@[^@]+\.[^@]+')
 
     def validate(self, value: str) -> bool:
         if self.blank and value == '':
@@ -229,83 +546,567 @@ class EmailValidator(Validator):
             self.error_message = '%s is not a valid email address.' % value
             return False
 
+    def validate_many(self, values: Iterable) -> BatchResult:
+        result = BatchResult.new()
+        match = EmailValidator.email_regex.match
+        for value in values:
+            if self.blank and value == '':
+                result.add(None)
+            elif match(value) and len(value) > 3:
+                result.add(value)
+            else:
+                result.fail('%s is not a valid email address.' % value)
+        return result
 
-class ListValidator(Validator):
 
-    def __init__(self, choices: List, filters: List = None):
-        self._choices = choices
+class _AnswersProbe(Mapping):
+
+    '''
+    A read-only view of the answers that remembers which keys filters read
+    from it.
+
+    If a filter looks at the table as a whole (iterating it, taking its
+    length, ...) then `everything` is set and the whole table is considered
+    a dependency.
+    '''
+
+    def __init__(self, answers: Mapping) -> None:
+        self._answers = answers
+        self.read: set = set()
+        self.everything = False
+
+    def __getitem__(self, key):
+        self.read.add(key)
+        return self._answers[key]
+
+    def __contains__(self, key) -> bool:
+        self.read.add(key)
+        return key in self._answers
+
+    def get(self, key, default=None):
+        self.read.add(key)
+        return self._answers.get(key, default)
+
+    def __iter__(self):
+        self.everything = True
+        return iter(self._answers)
+
+    def __len__(self) -> int:
+        self.everything = True
+        return len(self._answers)
+
+
+_MISSING = object()
+
+
+class FilteredValidator(Validator):
+
+    '''
+    Base class for validators choosing from a set of choices that can be
+    pruned by filters.  The filtered view is cached until `_choices`,
+    `filters` or an answer the filters read changes; call invalidate()
+    after changing the choices in place.  See the README for paged menus
+    and fuzzy matching.
+    '''
+
+    __slots__ = ('_choices', 'filters', 'page', 'search', 'cache_hits',
+                 'cache_misses', '_view', '_view_source', '_view_filters',
+                 '_view_deps', '_view_answers', '_ordered', '_ordered_source',
+                 '_index', '_index_source', '_vectors', '_vectors_source',
+                 '_menu', '_menu_source', '_matches', '_matches_source',
+                 '_matches_search', '_fragments', '_fragments_source',
+                 'index_threshold', 'vectorize', 'vectorize_threshold',
+                 'page_size', 'fuzzy', 'shortlist_size')
+
+    _choices: Any
+    filters: List
+
+    def __init__(self, filters: List = None,
+                 page_size: Optional[int] = None,
+                 fuzzy: bool = False) -> None:
         if filters is None:
             self.filters = []
         else:
             self.filters = filters
-        super(ListValidator, self).__init__()
+        self.page_size = page_size
+        self.fuzzy = fuzzy
+        self.index_threshold: Optional[int] = None
+        self.vectorize = False
+        self.vectorize_threshold = 2048
+        self.shortlist_size = 10
+        self.page = 0
+        self.search: Optional[str] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.invalidate()
+        super(FilteredValidator, self).__init__()
+
+    def invalidate(self) -> None:
+        '''Drop the cached filtered view of the choices.'''
+        # the caches start out as the shared empty tuple rather than new
+        # containers, they are only ever replaced
+        self._view: Any = None
+        self._view_source: Any = None
+        self._view_filters: Sequence = ()
+        self._view_deps: Optional[Sequence] = ()
+        self._view_answers: Optional[Dict] = None
+        self._ordered: Sequence = ()
+        self._ordered_source: Any = None
+        self._index: Optional[ChoiceIndex] = None
+        self._index_source: Any = None
+        self._vectors: Optional[ChoiceVectors] = None
+        self._vectors_source: Any = None
+        self._menu: Sequence = ()
+        self._menu_source: Any = None
+        self._matches: Sequence[int] = ()
+        self._matches_source: Any = None
+        self._matches_search: Optional[str] = None
+        self._fragments: Optional[ChoiceIndex] = None
+        self._fragments_source: Any = None
+
+    def _view_is_current(self) -> bool:
+        if self._view is None or self._view_source is not self._choices:
+            return False
+        if len(self._view_filters) != len(self.filters):
+            return False
+        for cached, current in zip(self._view_filters, self.filters):
+            if cached is not current:
+                return False
+        if self._view_deps is None:
+            return self._view_answers == self.answers
+        for key, value in self._view_deps:
+            if self.answers.get(key, _MISSING) != value:
+                return False
+        return True
 
     @property
-    def choices(self) -> List:
-        _choices = copy(self._choices)
-        for c in self._choices:
-            for f in self.filters:
-                if f.filter(c, self.answers):
-                    _choices.remove(c)
+    def choices(self) -> Any:
+        '''
+        The filtered choices.
+
+        This is a shared, cached object and should be treated as read-only.
+        '''
+        if self._view_is_current():
+            self.cache_hits += 1
+            return self._view
+        self.cache_misses += 1
+        probe = _AnswersProbe(self.answers)
+        self._view = self._filter(probe)
+        self._view_source = self._choices
+        self._view_filters = list(self.filters)
+        if probe.everything:
+            self._view_deps = None
+            self._view_answers = dict(self.answers)
+        else:
+            self._view_deps = [(key, self.answers.get(key, _MISSING))
+                               for key in probe.read]
+            self._view_answers = None
+        return self._view
+
+    def _order(self, choices: Any) -> List:
+        '''Return the choices as a list in display order.'''
+        return list(choices)
+
+    def _filter_value(self, item: Any) -> Any:
+        '''Return the part of an ordered item the filters look at.'''
+        return item
+
+    def _make_view(self, items: List) -> Any:
+        return items
+
+    def _ordered_choices(self) -> Sequence:
+        if self._ordered_source is not self._choices:
+            self._ordered = self._order(self._choices)
+            self._ordered_source = self._choices
+        return self._ordered
+
+    def _choice_index(self, ordered: Sequence) -> Optional[ChoiceIndex]:
+        threshold = self.index_threshold
+        if threshold is None or len(ordered) < threshold:
+            return None
+        if self._index_source is not ordered:
+            filter_value = self._filter_value
+            self._index = ChoiceIndex.build(
+                [filter_value(item) for item in ordered])
+            self._index_source = ordered
+        return self._index
+
+    def _choice_vectors(self, ordered: Sequence) -> Optional[ChoiceVectors]:
+        if not self.vectorize or len(ordered) < self.vectorize_threshold:
+            return None
+        if self._vectors_source is not ordered:
+            filter_value = self._filter_value
+            self._vectors = ChoiceVectors.build(
+                [filter_value(item) for item in ordered])
+            self._vectors_source = ordered
+        return self._vectors
+
+    def _narrow_vectorized(self, vectors: ChoiceVectors, ordered: Sequence,
+                           table: Mapping):
+        keep = None
+        unmasked = []
+        for f in self.filters:
+            mask = f.mask(vectors, table)
+            if mask is None:
+                unmasked.append(f)
+            elif keep is None:
+                keep = mask
+            else:
+                keep &= mask
+        if keep is not None:
+            ordered = [ordered[i] for i in vectors.positions(keep)]
+        return ordered, unmasked
+
+    def _narrow_indexed(self, index: ChoiceIndex, ordered: Sequence,
+                        table: Mapping):
+        positions: Optional[Set[int]] = None
+        unindexed = []
+        for f in self.filters:
+            if positions is not None and len(positions) * 8 < len(index):
+                # few candidates left, checking them directly is cheaper
+                unindexed.append(f)
+                continue
+            selected = f.select(index, table)
+            if selected is None:
+                unindexed.append(f)
+            elif positions is None:
+                positions = selected
+            else:
+                positions &= selected
+        if positions is not None:
+            ordered = [ordered[i] for i in sorted(positions)]
+        return ordered, unindexed
+
+    def dependencies(self) -> Optional[FrozenSet[str]]:
+        '''
+        Return the answer keys the filters read.  Once the filtered view
+        has been built these are the keys recorded while building it.
+        '''
+        if self._view is not None and self._view_filters == self.filters:
+            if self._view_deps is None:
+                return None
+            return frozenset(key for key, value in self._view_deps)
+        keys: Set[str] = set()
+        for f in self.filters:
+            filter_keys = f.dependencies()
+            if filter_keys is None:
+                return None
+            keys.update(filter_keys)
+        return frozenset(keys)
+
+    def _filter(self, table: Mapping) -> Any:
+        '''Return a new filtered view of `_choices`.'''
+        if isinstance(self._choices, ChoiceProvider):
+            items, filters = self._choices.select(self.filters, table)
+            kept = self._scan(items, filters, table)
+            if not self._choices.ordered:
+                kept = self._order(kept)
+            return self._make_view(kept)
+        ordered = self._ordered_choices()
+        filters = self.filters
+        if not filters:
+            return self._make_view(list(ordered))
+        vectors = self._choice_vectors(ordered)
+        if vectors is not None:
+            ordered, filters = self._narrow_vectorized(vectors, ordered, table)
+        else:
+            index = self._choice_index(ordered)
+            if index is not None:
+                ordered, filters = self._narrow_indexed(index, ordered, table)
+        if not filters:
+            return self._make_view(list(ordered))
+        return self._make_view(self._scan(ordered, filters, table))
+
+    def _scan(self, items: Iterable, filters: List,
+              table: Mapping) -> List:
+        '''Return the items none of `filters` drop, in order.'''
+        if not filters:
+            return list(items)
+        # the filter strings are looked up in `table` once, not per item
+        drops = [f.bind(table) for f in filters]
+        filter_value = self._filter_value
+        if len(drops) == 1:
+            drop = drops[0]
+            return [item for item in items if not drop(filter_value(item))]
+        kept = []
+        for item in items:
+            value = filter_value(item)
+            for drop in drops:
+                if drop(value):
                     break
-        _choices.sort(key=nonesorter)
-        return _choices
-
-    def print_choices(self) -> bool:
-        if len(self.choices) > 0:
-            print("Please select from the following choices:")
-            for x, y in enumerate(self.choices):
-                print(" [%d] - %s" % (x, str(y)))
+            else:
+                kept.append(item)
+        return kept
+
+    def _menu_items(self, choices: Any) -> Iterable:
+        return choices
+
+    def format_choice(self, index: int, choice: Any) -> str:
+        return " [%d] - %s" % (index, str(choice))
+
+    def render_choices(self, choices: Any) -> str:
+        '''Render the numbered menu for one snapshot of the choices.'''
+        lines = ["Please select from the following choices:"]
+        format_choice = self.format_choice
+        lines.extend([format_choice(x, y)
+                      for x, y in enumerate(self._menu_items(choices))])
+        lines.append('')
+        return '\n'.join(lines)
+
+    def _search_text(self, choice: Any) -> str:
+        return str(choice)
+
+    def _menu_choice(self, item: Any) -> Any:
+        '''Return the answer selecting a menu item gives.'''
+        return item
+
+    def _menu_list(self, choices: Any) -> Sequence:
+        '''Return the menu items of `choices` as a list, cached per view.'''
+        if isinstance(choices, list):
+            return choices
+        if self._menu_source is not choices:
+            self._menu = list(self._menu_items(choices))
+            self._menu_source = choices
+        return self._menu
+
+    def _menu_positions(self, choices: Any) -> Sequence[int]:
+        '''Return the indexes of the choices matching the current search.'''
+        menu = self._menu_list(choices)
+        if self.search is None:
+            return range(len(menu))
+        if self._matches_source is not menu or \
+                self._matches_search != self.search:
+            needle = self.search.lower()
+            search_text = self._search_text
+            self._matches = [i for i, choice in enumerate(menu)
+                             if needle in search_text(choice).lower()]
+            self._matches_source = menu
+            self._matches_search = self.search
+        return self._matches
+
+    def _is_paged(self, choices: Any) -> bool:
+        return self.page_size is not None and \
+            (len(choices) > self.page_size or self.search is not None)
+
+    def render_page(self, choices: Any) -> str:
+        '''Render the current page of the menu for `choices`.'''
+        menu = self._menu_list(choices)
+        positions = self._menu_positions(choices)
+        # only called for paged menus
+        size = cast(int, self.page_size)
+        pages = max(1, -(-len(positions) // size))
+        self.page = min(max(self.page, 0), pages - 1)
+        start = self.page * size
+        lines = ["Please select from the following choices:"]
+        format_choice = self.format_choice
+        lines.extend([format_choice(i, menu[i])
+                      for i in positions[start:start + size]])
+        if self.search is not None:
+            lines.append('%d of %d choices match "%s", / shows all.' %
+                         (len(positions), len(menu), self.search))
+        lines.append('Page %d of %d: > next, < previous, :N go to page N, '
+                     '/text search.' % (self.page + 1, pages))
+        lines.append('')
+        return '\n'.join(lines)
+
+    def reset_menu(self) -> None:
+        """ Go back to the first page of the menu, without a search. """
+        self.page = 0
+        self.search = None
+
+    def _menu_command(self, value: Any) -> bool:
+        """ Carry out `value` if it is a menu command.
+
+            Returns True if it was one, clearing the error message.
+        """
+        if self.page_size is None or not isinstance(value, str):
+            return False
+        if value == '>':
+            self.page += 1
+        elif value == '<':
+            self.page -= 1
+        elif value[:1] == ':' and value[1:].isdigit():
+            self.page = int(value[1:]) - 1
+        elif value[:1] == '/':
+            self.search = value[1:] or None
+            self.page = 0
+        else:
+            return False
+        self.error_message = None
+        return True
+
+    def _fragment_index(self, menu: Sequence) -> ChoiceIndex:
+        if self._fragments_source is not menu:
+            search_text = self._search_text
+            self._fragments = ChoiceIndex(
+                [search_text(item).lower() for item in menu])
+            self._fragments_source = menu
+        return self._fragments  # type: ignore
+
+    def _match_fragment(self, value: Any) -> Tuple[Any, Optional[str]]:
+        """ Return the choice the fragment `value` selects, or _MISSING
+            and an error listing the closest matches, if there are any.
+        """
+        menu = self._menu_list(self.choices)
+        if not isinstance(value, str) or not value or not menu:
+            return _MISSING, None
+        try:
+            int(value)
+        except ValueError:
+            pass
+        else:
+            # a number out of range, not a fragment of a choice
+            return _MISSING, None
+        index = self._fragment_index(menu)
+        needle = value.lower()
+        positions = index.contains(needle)
+        if positions is None:
+            # too short for a trigram, only look at prefixes
+            positions = index.startswith(needle)
+        if not positions:
+            return _MISSING, None
+        texts = index.values
+
+        def rank(position: int) -> Tuple:
+            text = texts[position]
+            return (text != needle, text.find(needle), len(text), position)
+
+        best = heapq.nsmallest(self.shortlist_size, positions, key=rank)
+        if len(positions) == 1 or texts[best[0]] == needle:
+            return self._menu_choice(menu[best[0]]), None
+        shown = ', '.join(['[%d] %s' % (i, self._menu_choice(menu[i]))
+                           for i in best])
+        if len(positions) > len(best):
+            shown += ', ...'
+        return _MISSING, '%s matches %d choices: %s' % (
+            value, len(positions), shown)
+
+    def _not_a_choice(self, value: Any) -> bool:
+        """ Finish validating `value` once it is neither a choice nor the
+            number of one: carry out menu commands and match fragments.
+        """
+        if self._menu_command(value):
+            return False
+        message = None
+        if self.fuzzy:
+            choice, message = self._match_fragment(value)
+            if choice is not _MISSING:
+                self._choice = choice
+                return True
+        self.error_message = message or '%s is not a valid choice.' % value
+        return False
+
+    def _batch_not_a_choice(self, result: BatchResult, value: Any) -> None:
+        message = None
+        if self.fuzzy:
+            choice, message = self._match_fragment(value)
+            if choice is not _MISSING:
+                result.add(choice)
+                return
+        result.fail(message or '%s is not a valid choice.' % value)
+
+    def has_choices(self) -> bool:
+        return len(self.choices) > 0
+
+    def print_choices(self, out: Output = None) -> bool:
+        '''Write the menu to `out`, sys.stdout by default.'''
+        if out is None:
+            out = sys.stdout
+        choices = self.choices
+        if len(choices) > 0:
+            if self._is_paged(choices):
+                out.write(self.render_page(choices))
+            else:
+                out.write(self.render_choices(choices))
             return True
         else:
             return False
 
+
+class ListValidator(FilteredValidator):
+
+    __slots__ = ('_members_view', '_members_source')
+
+    def __init__(self, choices: Any, filters: List = None,
+                 page_size: Optional[int] = None, fuzzy: bool = False):
+        """ `choices` is a list, or a ChoiceProvider, callable or iterator
+            fetching them lazily.
+        """
+        self._choices = as_provider(choices) or choices
+        super(ListValidator, self).__init__(filters, page_size, fuzzy)
+
+    def invalidate(self) -> None:
+        super(ListValidator, self).invalidate()
+        self._members_view: Any = None
+        self._members_source: Any = None
+
+    def _order(self, choices: List) -> List:
+        return sorted(choices, key=nonesorter)
+
+    def _members(self, choices: List) -> Any:
+        '''Return `choices` as a set if possible, cached per view.'''
+        if self._members_source is not choices:
+            try:
+                self._members_view = set(choices)
+            except TypeError:
+                self._members_view = choices
+            self._members_source = choices
+        return self._members_view
+
     def validate(self, value: str) -> bool:
         """Return a boolean if the choice is a number in the enumeration"""
-        if value in self.choices:
+        choices = self.choices
+        try:
+            found = value in self._members(choices)
+        except TypeError:
+            found = value in choices
+        if found:
             self._choice = value
             return True
         try:
-            self._choice = self.choices[int(value)]
+            self._choice = choices[int(value)]
             return True
         except (ValueError, IndexError):
-            self.error_message = '%s is not a valid choice.' % value
-            return False
+            return self._not_a_choice(value)
+
+    def validate_many(self, values: Iterable) -> BatchResult:
+        result = BatchResult.new()
+        choices = self.choices
+        members = self._members(choices)
+        for value in values:
+            if value in members:
+                result.add(value)
+                continue
+            try:
+                result.add(choices[int(value)])
+            except (ValueError, IndexError):
+                self._batch_not_a_choice(result, value)
+        return result
+
 
+class TupleValidator(FilteredValidator):
+    __slots__ = ()
 
-class TupleValidator(Validator):
     _choices: List
-    filters: List
 
-    def __init__(self, choices: Dict, filters: List = None):
+    def __init__(self, choices: Dict, filters: List = None,
+                 page_size: Optional[int] = None, fuzzy: bool = False):
         assert isinstance(choices, list)
         self._choices = choices
-        if filters is None:
-            self.filters = []
-        else:
-            self.filters = filters
-        super(TupleValidator, self).__init__()
+        super(TupleValidator, self).__init__(filters, page_size, fuzzy)
 
-    @property
-    def choices(self) -> List:
-        _choices = copy(self._choices)
-        for c in self._choices:
-            for f in self.filters:
-                if f.filter(c, self.answers):
-                    _choices.remove(c)
-                    break
-        _choices.sort()
-        return _choices
-
-    def print_choices(self) -> bool:
-        if len(self.choices) > 0:
-            print("Please select from the following choices:")
-            for x, y in enumerate(self.choices):
-                a, b = y
-                print(" [%d] - %s (%s)" % (x, a, b))
-            return True
-        else:
-            return False
+    def _order(self, choices: List) -> List:
+        return sorted(choices)
+
+    def format_choice(self, index: int, choice: Any) -> str:
+        a, b = choice
+        return " [%d] - %s (%s)" % (index, a, b)
+
+    def _search_text(self, choice: Any) -> str:
+        return '%s %s' % choice
+
+    def _menu_choice(self, item: Any) -> Any:
+        return item[0]
 
     def validate(self, value: str) -> bool:
         """Return a boolean if the choice a number in the enumeration"""
@@ -317,61 +1118,105 @@ class TupleValidator(Validator):
             self._choice = self.choices[int(value)][0]
             return True
         except (ValueError, IndexError):
-            self.error_message = '%s is not a valid choice.' % value
-            return False
+            return self._not_a_choice(value)
+
+    def validate_many(self, values: Iterable) -> BatchResult:
+        result = BatchResult.new()
+        choices = self.choices
+        keys = {x for x, y in choices}
+        for value in values:
+            if value in keys:
+                result.add(value)
+                continue
+            try:
+                result.add(choices[int(value)][0])
+            except (ValueError, IndexError):
+                self._batch_not_a_choice(result, value)
+        return result
 
 
-class HashValidator(Validator):
+class HashValidator(FilteredValidator):
 
-    def __init__(self, choices: Dict, filters: List = None,
-                 verbose: bool = True) -> None:
-        self._choices = OrderedDict()
+    __slots__ = ('verbose',)
+
+    def __init__(self, choices: Any, filters: List = None,
+                 verbose: bool = True,
+                 page_size: Optional[int] = None,
+                 fuzzy: bool = False) -> None:
+        """ `choices` is a dict, or a ChoiceProvider, callable or iterator
+            fetching (key, value) pairs lazily.
+        """
         self.verbose = verbose
-        for x in choices:
-            self._choices[x] = choices[x]
-        if filters is None:
-            self.filters = []
+        provider = as_provider(choices)
+        if provider is not None:
+            self._choices = provider
         else:
-            self.filters = filters
-        super(HashValidator, self).__init__()
-
-    @property
-    def choices(self) -> Dict:
-        _choices = copy(self._choices)
-        for c in self._choices:
-            for f in self.filters:
-                if f.filter(_choices[c], self.answers):
-                    del _choices[c]
-                    break
-        return _choices
-
-    def print_choices(self) -> bool:
-        if len(self.choices) > 0:
-            print("Please select from the following choices:")
-            for x, y in enumerate(self.choices):
-                if self.verbose:
-                    print(" [%d] - %s (%s)" % (x, y, self.choices[y]))
-                else:
-                    print(" [%d] - %s" % (x, y))
-            return True
+            self._choices = OrderedDict()
+            for x in choices:
+                self._choices[x] = choices[x]
+        super(HashValidator, self).__init__(filters, page_size, fuzzy)
+
+    def _order(self, choices: Any) -> List:
+        if isinstance(choices, Mapping):
+            return list(choices.items())
+        # (key, value) pairs from a ChoiceProvider
+        return list(choices)
+
+    def _filter_value(self, item: Any) -> Any:
+        return item[1]
+
+    def _make_view(self, items: List) -> Dict:
+        return OrderedDict(items)
+
+    def _menu_items(self, choices: Any) -> Iterable:
+        return choices.items()
+
+    def format_choice(self, index: int, choice: Any) -> str:
+        key, value = choice
+        if self.verbose:
+            return " [%d] - %s (%s)" % (index, key, value)
         else:
-            return False
+            return " [%d] - %s" % (index, key)
+
+    def _search_text(self, choice: Any) -> str:
+        if self.verbose:
+            return '%s %s' % choice
+        return str(choice[0])
+
+    def _menu_choice(self, item: Any) -> Any:
+        return item[0]
 
     def validate(self, value: str) -> bool:
         """Return a boolean if the choice is a number in the enumeration"""
-        if value in list(self.choices.keys()):
+        choices = self.choices
+        if value in choices:
             self._choice = value
             return True
         try:
-            self._choice = list(self.choices.keys())[int(value)]
+            self._choice = list(choices.keys())[int(value)]
             return True
         except (ValueError, IndexError):
-            self.error_message = '%s is not a valid choice.' % value
-            return False
+            return self._not_a_choice(value)
+
+    def validate_many(self, values: Iterable) -> BatchResult:
+        result = BatchResult.new()
+        choices = self.choices
+        keys = list(choices.keys())
+        for value in values:
+            if value in choices:
+                result.add(value)
+                continue
+            try:
+                result.add(keys[int(value)])
+            except (ValueError, IndexError):
+                self._batch_not_a_choice(result, value)
+        return result
 
 
 class IntegerValidator(Validator):
 
+    __slots__ = ()
+
     def validate(self, value: int) -> bool:
         """
         Return True if the choice is an integer; False otherwise.
@@ -387,3 +1232,12 @@ class IntegerValidator(Validator):
         except ValueError:
             self.error_message = '%s is not a valid integer.' % value
             return False
+
+    def validate_many(self, values: Iterable) -> BatchResult:
+        result = BatchResult.new()
+        for value in values:
+            try:
+                result.add(int(value))
+            except ValueError:
+                result.fail('%s is not a valid integer.' % value)
+        return result
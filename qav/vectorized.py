@@ -0,0 +1,77 @@
+# qav (Question Answer Validation)
+# Copyright (C) 2015 UMIACS
+
+from typing import Any, List, Optional
+
+_UNLOADED: Any = object()
+
+# NumPy takes longer to import than the rest of qav together, so it is only
+# imported the first time vectorized filtering is asked for
+numpy: Any = _UNLOADED
+
+
+def _numpy() -> Any:
+    '''Return the numpy module, or None if it is not installed.'''
+    global numpy
+    if numpy is _UNLOADED:
+        try:
+            import numpy as module  # type: ignore
+            numpy = module
+        except ImportError:  # pragma: no cover
+            numpy = None
+    return numpy
+
+
+def available() -> bool:
+    '''Return True if NumPy can be used for vectorized filtering.'''
+    return _numpy() is not None
+
+
+class ChoiceVectors(object):
+
+    '''
+    A NumPy string array over a fixed sequence of strings.
+
+    PreFilter, PostFilter and SubFilter queries are answered with a single
+    vectorized operation returning a boolean mask of the strings to keep.
+    Queries that can not be vectorized return None.
+    '''
+
+    def __init__(self, values: List[str]) -> None:
+        self.array = _numpy().array(values, dtype=str)
+
+    @classmethod
+    def build(cls, values: List) -> Optional['ChoiceVectors']:
+        '''
+        Return vectors over `values`, or None if NumPy is not installed or
+        the values are not all strings.
+        '''
+        if not available():
+            return None
+        for value in values:
+            if not isinstance(value, str):
+                return None
+        return cls(values)
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def startswith(self, s: str) -> Any:
+        if not isinstance(s, str):
+            return None
+        return numpy.char.startswith(self.array, s)
+
+    def endswith(self, s: str) -> Any:
+        if not isinstance(s, str):
+            return None
+        return numpy.char.endswith(self.array, s)
+
+    def contains(self, s: str) -> Any:
+        if not isinstance(s, str):
+            return None
+        return numpy.char.find(self.array, s) >= 0
+
+    @staticmethod
+    def positions(mask: Any) -> List[int]:
+        '''Return the positions set in `mask`, in order.'''
+        return numpy.flatnonzero(mask).tolist()
@@ -23,6 +23,9 @@ setup(
     install_requires=[
         'netaddr',
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     url='https://github.com/UMIACS/qav',
     license='LGPL v2.1',
     description='Question Answer Validation',
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import io
+import threading
+
+import pytest
+
+from qav.console import Console
+
+
+class CountingStream(io.StringIO):
+
+    def __init__(self):
+        super(CountingStream, self).__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super(CountingStream, self).write(text)
+
+
+class RecordingInput(object):
+
+    '''Answers in turn, recording what had been written at each read.'''
+
+    def __init__(self, out, lines):
+        self.out = out
+        self.lines = lines
+        self.seen = []
+        self.threads = set()
+
+    def readline(self):
+        self.seen.append(self.out.getvalue())
+        self.threads.add(threading.current_thread().name)
+        return self.lines.pop(0) if self.lines else ''
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestConsole(object):
+
+    def test_prompt_flushes_once(self):
+        out = CountingStream()
+        console = Console(io.StringIO('answer\n'), out)
+        console.writeline('one')
+        console.write('two\n')
+        assert out.getvalue() == ''
+        assert console.prompt('? ') == 'answer'
+        assert out.getvalue() == 'one\ntwo\n? '
+        assert out.writes == 1
+
+    def test_eof(self):
+        console = Console(io.StringIO(''), io.StringIO())
+        with pytest.raises(EOFError):
+            console.prompt('? ')
+
+    def test_flush_to_stdout(self, capsys):
+        console = Console(stdin=io.StringIO())
+        console.writeline('hello')
+        console.flush()
+        out, err = capsys.readouterr()
+        assert out == 'hello\n'
+
+    def test_prompt_async_takes_turns(self):
+        out = io.StringIO()
+        stdin = RecordingInput(out, ['a\n', 'b\n'])
+        console = Console(stdin, out)
+
+        async def ask_both():
+            return await asyncio.gather(console.prompt_async('one? '),
+                                        console.prompt_async('two? '))
+
+        assert run(ask_both()) == ['a', 'b']
+        # the second prompt is only shown once the first was answered
+        assert stdin.seen == ['one? ', 'one? two? ']
+        assert len(stdin.threads) == 1
+        assert stdin.threads.pop().startswith('qav-console')
+
+    def test_prompt_async_eof(self):
+        console = Console(io.StringIO(''), io.StringIO())
+        with pytest.raises(EOFError):
+            run(console.prompt_async('? '))
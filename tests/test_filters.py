@@ -1,16 +1,40 @@
 # -*- coding: utf-8 -*-
 
+from collections.abc import Mapping
+
+import pytest
+
 from qav.filters import (
     DynamicFilter,
     SubFilter,
     PreFilter,
     PostFilter,
 )
-from qav.validators import ListValidator
+from qav.validators import HashValidator, ListValidator
 
 
 class TestFilters(object):
 
+    def test_dynamic_filter_table(self):
+        tables = []
+
+        def keep_rack(value, table):
+            tables.append(table)
+            return not value.startswith(table['rack'])
+
+        v = ListValidator(['r1-a', 'r2-b'], filters=[DynamicFilter(keep_rack)])
+        v.answers = {'rack': 'r2', 'other': 'x'}
+        assert v.choices == ['r2-b']
+        # only the answers read by the filter are dependencies
+        assert v.dependencies() == frozenset(['rack'])
+        assert isinstance(tables[0], Mapping)
+        assert dict(tables[0]) == {'rack': 'r2', 'other': 'x'}
+
+    def test_slots(self):
+        for f in (SubFilter('a'), PreFilter('a'), PostFilter('a'),
+                  DynamicFilter(bool)):
+            assert not hasattr(f, '__dict__')
+
     def test_dynamic_filter(self):
         def filter_things_with_foo(value, choices):
             return 'foo' in value
@@ -56,3 +80,88 @@ class TestFilters(object):
             choices,
             filters=[PostFilter('r')])
         assert validator.choices == ['bar']
+
+    def test_answers_read_once_per_rebuild(self):
+        class CountingAnswers(Mapping):
+
+            def __init__(self, answers):
+                self.answers = answers
+                self.reads = 0
+
+            def __getitem__(self, key):
+                self.reads += 1
+                return self.answers[key]
+
+            def __iter__(self):
+                return iter(self.answers)
+
+            def __len__(self):
+                return len(self.answers)
+
+        def reads(choices):
+            answers = CountingAnswers({'prefix': 'host1', 'part': '9'})
+            v = ListValidator(choices, filters=[
+                PreFilter('prefix'), SubFilter('part'), PostFilter('9')])
+            v.answers = answers
+            v.choices
+            assert v.dependencies() == frozenset(['prefix', 'part', '9'])
+            return answers.reads
+
+        # the answers are read once a rebuild, not once a choice
+        assert reads(['host%d' % i for i in range(200)]) == reads(['host19'])
+
+    def test_indexed_filters_match_scan(self):
+        choices = ['host%d.example.com' % i for i in range(200)]
+        choices += ['node%d.example.org' % i for i in range(200)]
+        filters = [
+            PreFilter('host1'),
+            PostFilter('.com'),
+            SubFilter('st19'),
+            DynamicFilter(lambda value, table: value.endswith('5.example.com')),
+        ]
+        scanned = ListValidator(choices, filters=filters)
+        indexed = ListValidator(choices, filters=filters)
+        indexed.index_threshold = 0
+        assert indexed.choices == scanned.choices
+        # the index is opt-in
+        assert scanned._index is None
+        assert indexed._index is not None
+        assert indexed.choices == ['host19.example.com',
+                                   'host190.example.com',
+                                   'host191.example.com',
+                                   'host192.example.com',
+                                   'host193.example.com',
+                                   'host194.example.com',
+                                   'host196.example.com',
+                                   'host197.example.com',
+                                   'host198.example.com',
+                                   'host199.example.com']
+
+    def test_indexed_filter_reads_answers(self):
+        v = HashValidator({'a': 'foo', 'b': 'bar'}, filters=[PreFilter('p')])
+        v.index_threshold = 0
+        v.answers = {'p': 'b'}
+        assert list(v.choices) == ['b']
+
+    def test_vectorized_filters_match_scan(self):
+        pytest.importorskip('numpy')
+        choices = ['host%d.example.com' % i for i in range(50)] + ['other']
+        filters = [
+            PreFilter('host1'),
+            SubFilter('xamp'),
+            DynamicFilter(lambda value, table: value.startswith('host12')),
+        ]
+        scanned = ListValidator(choices, filters=filters)
+        vectorized = ListValidator(choices, filters=filters)
+        vectorized.vectorize = True
+        vectorized.vectorize_threshold = 0
+        assert vectorized.choices == scanned.choices
+        assert vectorized._vectors is not None
+
+    def test_vectorize_without_numpy(self, monkeypatch):
+        monkeypatch.setattr('qav.vectorized.numpy', None)
+        v = HashValidator({'a': 'foo', 'b': 'bar'}, filters=[PreFilter('f')])
+        v.vectorize = True
+        v.vectorize_threshold = 0
+        assert list(v.choices) == ['a']
+        assert v._vectors is None
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+from qav.index import ChoiceIndex
+
+
+class TestChoiceIndex(object):
+
+    values = ['gpu10', 'gpu2', 'cpu1', 'gpu1', 'storage1', 'gpu']
+
+    def test_build_requires_strings(self):
+        assert ChoiceIndex.build(['a', None]) is None
+        assert isinstance(ChoiceIndex.build(['a', 'b']), ChoiceIndex)
+
+    def test_startswith(self):
+        index = ChoiceIndex(self.values)
+        assert index.startswith('gpu1') == {0, 3}
+        assert index.startswith('') == set(range(len(self.values)))
+        assert index.startswith('x') == set()
+
+    def test_endswith(self):
+        index = ChoiceIndex(self.values)
+        assert index.endswith('1') == {2, 3, 4}
+        assert index.endswith('pu') == {5}
+
+    def test_contains(self):
+        index = ChoiceIndex(self.values)
+        assert index.contains('pu1') == {0, 2, 3}
+        assert index.contains('orag') == {4}
+        assert index.contains('zzz') == set()
+
+    def test_unanswerable_queries(self):
+        index = ChoiceIndex(self.values)
+        assert index.contains('pu') is None
+        assert index.startswith(5) is None
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import io
+
 from qav.listpack import ListPack
 
 
@@ -27,3 +29,59 @@ class TestListPack(object):
         lp = ListPack([('a', 'b')])
         lp.prepend_item(('c', 'd'))
         assert str(lp) == '\n\x1b[1mc\x1b[0m: d  \x1b[1ma\x1b[0m: b  '
+
+    def test_wrapping(self):
+        deets = [('name', 'Cicero'), ('occupation', 'orator'), ('born', '106 BC')]
+        lp = ListPack(deets, width=40)
+        assert list(lp.iter_lines()) == [
+            '\x1b[1mname\x1b[0m: Cicero  \x1b[1moccupation\x1b[0m: orator  ',
+            '\x1b[1mborn\x1b[0m: 106 BC  ',
+        ]
+        assert str(lp) == '\n'.join(lp.iter_lines())
+
+    def test_render(self):
+        deets = [('item%d' % i, i) for i in range(1000)]
+        lp = ListPack(deets, indentation=2)
+        out = io.StringIO()
+        lp.render(out)
+        assert out.getvalue() == str(lp)
+        assert all(len(line) <= 79 + 9 * 7
+                   for line in out.getvalue().split('\n'))
+
+    def test_remove_item(self):
+        lp = ListPack([('a', 'b'), ('c', 'd')])
+        lp.remove_item(('a', 'b'))
+        assert str(lp) == '\n\x1b[1mc\x1b[0m: d  '
+        assert len(lp) == 1
+
+    def test_incremental_layout(self):
+        deets = [('item%d' % i, 'x' * (i % 13)) for i in range(200)]
+        lp = ListPack(list(deets), width=40)
+        str(lp)
+        lp.prepend_item(('first', 'value'))
+        lp.append_item(('last', 'value'))
+        lp.remove_item(('item7', 'x' * 7))
+        deets = [('first', 'value')] + deets + [('last', 'value')]
+        deets.remove(('item7', 'x' * 7))
+        assert str(lp) == str(ListPack(deets, width=40))
+
+    def test_set_item(self):
+        deets = [('item%d' % i, 'x' * (i % 13)) for i in range(60)]
+        lp = ListPack(list(deets), width=40)
+        str(lp)
+        lp.set_item(5, ('item5', 'y' * 30))
+        lp.set_item(-1, ('last', ''))
+        deets[5] = ('item5', 'y' * 30)
+        deets[-1] = ('last', '')
+        assert list(lp) == deets
+        assert str(lp) == str(ListPack(deets, width=40))
+
+    def test_relayout_on_width_change(self):
+        deets = [('name', 'Cicero'), ('occupation', 'orator')]
+        lp = ListPack(deets)
+        str(lp)
+        lp.width = 20
+        assert str(lp) == str(ListPack(deets, width=20))
+
+    def test_slots(self):
+        assert not hasattr(ListPack(), '__dict__')
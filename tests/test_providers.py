@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from qav.filters import PreFilter
+from qav.providers import ChoiceProvider, as_provider, paged
+from qav.validators import HashValidator, ListValidator
+
+
+class TestChoiceProvider(object):
+
+    def test_lazy_and_cached(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return ['b', 'a']
+
+        provider = ChoiceProvider(fetch)
+        assert calls == []
+        assert list(provider) == ['b', 'a']
+        assert list(provider) == ['b', 'a']
+        assert provider.fetches == 1
+        provider.clear()
+        assert list(provider) == ['b', 'a']
+        assert provider.fetches == 2
+
+    def test_size_bound(self):
+        provider = ChoiceProvider(lambda: range(5), maxsize=4)
+        assert list(provider) == [0, 1, 2, 3, 4]
+        assert list(provider) == [0, 1, 2, 3, 4]
+        assert provider.fetches == 2
+
+    def test_iterator_read_once(self):
+        # kept whatever its size, as it can not be read again
+        provider = ChoiceProvider(iter(range(5)), maxsize=2)
+        assert list(provider) == [0, 1, 2, 3, 4]
+        assert list(provider) == [0, 1, 2, 3, 4]
+        assert provider.fetches == 1
+        provider.clear()
+        with pytest.raises(ValueError):
+            list(provider)
+
+    def test_paged(self):
+        requested = []
+
+        def fetch(offset, limit):
+            requested.append(offset)
+            return list(range(10))[offset:offset + limit]
+
+        assert list(paged(fetch, page_size=4)()) == list(range(10))
+        assert requested == [0, 4, 8]
+
+    def test_as_provider(self):
+        assert as_provider(['a']) is None
+        assert as_provider({'a': 1}) is None
+        assert isinstance(as_provider(lambda: []), ChoiceProvider)
+        assert isinstance(as_provider(iter([])), ChoiceProvider)
+
+
+class TestProvidedChoices(object):
+
+    def test_list_validator(self):
+        v = ListValidator(lambda: iter(['one dog', 'two dogs', 'one cat']),
+                          filters=[PreFilter('one')])
+        assert v.choices == ['one cat', 'one dog']
+        assert v.validate('1') is True
+        assert v.choice() == 'one dog'
+
+    def test_streamed_filtering(self):
+        # too many rows to cache, so every rebuild fetches them again
+        provider = ChoiceProvider(
+            lambda: ('host%d' % i for i in range(1000)), maxsize=100)
+        v = ListValidator(provider, filters=[PreFilter('start')])
+        v.answers = {'start': 'host99'}
+        assert v.choices == ['host99', 'host990', 'host991', 'host992',
+                             'host993', 'host994', 'host995', 'host996',
+                             'host997', 'host998', 'host999']
+        v.answers = {'start': 'host5'}
+        assert len(v.choices) == 111
+        assert provider.fetches == 2
+
+    def test_large_iterator(self):
+        v = ListValidator(iter(['host%05d' % i for i in range(20000)]),
+                          filters=[PreFilter('prefix')])
+        v.answers = {'prefix': 'host1999'}
+        assert len(v.choices) == 10
+        v.answers = {'prefix': 'host0000'}
+        assert v.choices == ['host0000%d' % i for i in range(10)]
+
+    def test_hash_validator(self):
+        pages = paged(lambda offset, limit:
+                      [('a', 'one'), ('b', 'two')][offset:offset + limit],
+                      page_size=1)
+        v = HashValidator(ChoiceProvider(pages),
+                          filters=[PreFilter('t')])
+        assert list(v.choices.items()) == [('b', 'two')]
+        assert v.validate('0') is True
+        assert v.choice() == 'b'
@@ -1,9 +1,20 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+import io
+import logging
+import subprocess
+import sys
+
 import pytest
 
-from qav.questions import Question, QuestionSet
+from qav.filters import PreFilter
+from qav.listpack import ListPack
+from qav.questions import (AnswerContext, AnswerError, Question, QuestionSet,
+                           logger)
 from qav.validators import (
+    IntegerValidator,
+    ListValidator,
     Validator,
     YesNoValidator,
 )
@@ -46,6 +57,16 @@ class TestQuestion(object):
         assert question.value == 'age'
         assert isinstance(question.validator, Validator)
 
+    def test_slots(self):
+        assert not hasattr(Question('Your age?', 'age'), '__dict__')
+
+    def test_input_override(self):
+        question = Question('Your age?', 'age', IntegerValidator())
+        question._get_input = lambda text: '42'
+        assert question.ask() == {'age': 42}
+        question._get_input = question._prompt
+        assert question._input_override is None
+
     def test_equals(self):
         q1 = Question('Your age?', 'age')
         q2 = Question('Your age?', 'age')
@@ -121,6 +142,18 @@ class TestQuestion(object):
         with pytest.raises(Exception):
             Question().remove(5)
 
+    def test_print_choices_without_output(self, give_input, capsys):
+        class MenuValidator(Validator):
+
+            def print_choices(self):
+                print('1. the menu')
+                return True
+
+        q = Question('Pick one', 'pick', validator=MenuValidator())
+        give_input(q, ['1'])
+        assert q.ask() == {'pick': '1'}
+        assert capsys.readouterr().out == '1. the menu\n'
+
     def test_remove_question(self):
         q = Question('favorite food?', 'food')
         subq = Question('Why is %(food)s your favorite food?', 'why')
@@ -128,3 +161,411 @@ class TestQuestion(object):
         assert len(q._questions) == 1
         q.remove(subq)
         assert len(q._questions) == 0
+
+
+class TestAnswerFrom(object):
+
+    def make_question_set(self):
+        qs = QuestionSet()
+        host = Question('Host?', 'host',
+                        validator=ListValidator(['gpu1', 'gpu2', 'cpu1'],
+                                                filters=[PreFilter('kind')]))
+        host.add(Question('Port for %(host)s?', 'port',
+                          validator=IntegerValidator()))
+        qs.add(Question('Kind?', 'kind')).add(host)
+        return qs
+
+    def test_answer_from(self):
+        qs = self.make_question_set()
+        result = qs.answer_from({'kind': 'gpu', 'host': '1', 'port': '22'})
+        assert result.answers == {'kind': 'gpu', 'host': 'gpu2', 'port': 22}
+        assert result.errors == []
+        assert qs.answers == {}
+
+    def test_errors(self):
+        qs = self.make_question_set()
+        result = qs.answer_from({'kind': 'gpu', 'host': 'cpu1'})
+        assert result.answers == {'kind': 'gpu', 'host': None, 'port': None}
+        assert result.errors == [
+            AnswerError('host', 'cpu1', 'cpu1 is not a valid choice.'),
+            AnswerError('port', None, 'No answer was given.'),
+        ]
+
+    def test_defaults(self):
+        qs = self.make_question_set()
+        qs.answers = {'port': '80'}
+        result = qs.answer_from({'kind': 'cpu', 'host': 'cpu1'})
+        assert result.answers['port'] == 80
+        assert result.errors == []
+        result = qs.answer_from({'kind': 'cpu', 'host': 'cpu1', 'port': ''})
+        assert result.answers['port'] == 80
+        assert result.errors == []
+
+    def test_multiple(self):
+        q = Question('Flavors?', 'flavors', multiple=True,
+                     validator=YesNoValidator())
+        result = q.answer_from({'flavors': ['yes', 'sure', 'NO']})
+        assert result.answers == {'flavors': ['yes', 'no']}
+        assert len(result.errors) == 1
+
+    def test_answer_all(self):
+        qs = self.make_question_set()
+        records = [{'kind': 'gpu', 'host': 'gpu1', 'port': '1'},
+                   {'kind': 'cpu', 'host': 'cpu1', 'port': '2'}]
+        results = list(qs.answer_all(records))
+        assert [r.answers['host'] for r in results] == ['gpu1', 'cpu1']
+        assert [r.answers['port'] for r in results] == [1, 2]
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestAskAsync(object):
+
+    def test_ask_async(self, give_input):
+        question = Question('favorite food?', 'food')
+        subquestion = Question('favorite time to eat %(food)s?', 'time')
+        question.add(subquestion)
+        give_input(question, ['pesto'])
+        give_input(subquestion, ['9 PM'])
+        assert run(question.ask_async()) == {'food': 'pesto', 'time': '9 PM'}
+
+    def test_question_set_ask_async(self, give_input):
+        qs = QuestionSet()
+        q1 = Question('foo', 'foo')
+        q2 = Question('bar', 'bar', validator=IntegerValidator())
+        qs.add(q1).add(q2)
+        give_input(q1, ['98'])
+        give_input(q2, ['x', '99'])
+        assert run(qs.ask_async()) == {'foo': '98', 'bar': 99}
+
+    def test_async_validator_and_input(self):
+        class SlowValidator(Validator):
+
+            async def validate_async(self, value):
+                await asyncio.sleep(0)
+                return self.validate(value)
+
+        class AsyncQuestion(Question):
+
+            def __init__(self, *args, **kwargs):
+                super(AsyncQuestion, self).__init__(*args, **kwargs)
+                self.queue = asyncio.Queue()
+
+            async def _get_input_async(self, text):
+                return await self.queue.get()
+
+        async def ask_both():
+            q1 = AsyncQuestion('one?', 'one', validator=SlowValidator())
+            q2 = AsyncQuestion('two?', 'two', validator=SlowValidator())
+            asked = asyncio.gather(q1.ask_async(), q2.ask_async())
+            # the prompts are multiplexed; answer the second one first
+            q2.queue.put_nowait('2')
+            q1.queue.put_nowait('1')
+            return await asked
+
+        assert run(ask_both()) == [{'one': '1'}, {'two': '2'}]
+
+    def test_concurrent_prompts_share_console(self):
+        stdin = io.StringIO('1\n2\n')
+        stdout = io.StringIO()
+        q1 = Question('one', 'one', stdin=stdin, stdout=stdout)
+        q2 = Question('two', 'two', stdin=stdin, stdout=stdout)
+        q2.console = q1.console
+
+        async def ask_both():
+            return await asyncio.gather(q1.ask_async(), q2.ask_async())
+
+        assert run(ask_both()) == [{'one': '1'}, {'two': '2'}]
+        assert stdout.getvalue() == 'one: two: '
+
+    def test_ask_and_confirm_async(self, monkeypatch, capsys):
+        answers = {'name?': 'x', 'Are these answers correct? ' +
+                   '[yes/abort/retry]': 'yes'}
+
+        def mock_input(self, text):
+            return answers[text.split(':')[0]]
+
+        monkeypatch.setattr(Question, '_get_input', mock_input)
+        qs = QuestionSet().add(Question('name?', 'name'))
+        assert run(qs.ask_and_confirm_async()) == {'name': 'x'}
+
+    def test_streams(self):
+        stdin = io.StringIO('9\nbar\nyes\n')
+        stdout = io.StringIO()
+        qs = QuestionSet(stdin=stdin, stdout=stdout)
+        qs.add(Question('pick', 'pick', ListValidator(['bar', 'foo'])))
+        assert qs.ask_and_confirm() == {'pick': 'bar'}
+        assert stdout.getvalue() == (
+            'Please select from the following choices:\n'
+            ' [0] - bar\n [1] - foo\npick: '
+            'ERROR: 9 is not a valid choice.\n'
+            'Please select from the following choices:\n'
+            ' [0] - bar\n [1] - foo\npick: '
+            '\n\x1b[1mpick\x1b[0m: bar  \n'
+            'Are these answers correct? [yes/abort/retry]: ')
+
+    @pytest.mark.parametrize('asynchronous', (False, True))
+    def test_output_before_replaced_input(self, asynchronous):
+        stdout = io.StringIO()
+        answers = ['9', 'bar', '.']
+        seen = []
+
+        class ReplacedInput(Question):
+
+            def _get_input(self, text):
+                seen.append(stdout.getvalue())
+                return answers.pop(0)
+
+        q = ReplacedInput('pick', 'pick', ListValidator(['bar', 'foo']),
+                          multiple=True, stdout=stdout)
+        if asynchronous:
+            assert run(q.ask_async()) == {'pick': ['bar']}
+        else:
+            assert q.ask() == {'pick': ['bar']}
+        menu = ('Please select from the following choices:\n'
+                ' [0] - bar\n [1] - foo\n')
+        banner = ('\x1b[1mMultiple answers are supported for this question.'
+                  '  Please enter a "."  character to finish.\x1b[0m\n')
+        assert seen == [
+            banner + menu,
+            banner + menu + 'ERROR: 9 is not a valid choice.\n' + menu,
+            banner + menu + 'ERROR: 9 is not a valid choice.\n' + menu * 2,
+        ]
+
+    def test_streams_are_lent(self):
+        own = io.StringIO()
+        q = Question('pick', 'pick', stdin=io.StringIO('mine\n'), stdout=own)
+        original = q.console
+        qs = QuestionSet(stdin=io.StringIO('lent\n'), stdout=io.StringIO())
+        qs.add(q)
+        qs.compile()
+        assert q.console is original
+        assert qs.ask() == {'pick': 'lent'}
+        assert q.console is original
+        assert q.ask() == {'pick': 'mine'}
+        assert own.getvalue() == 'pick: '
+
+
+class TestPlan(object):
+
+    def test_order(self):
+        a = Question('a', 'a')
+        b = Question('b', 'b')
+        c = Question('c', 'c')
+        d = Question('d', 'd')
+        a.add(b)
+        b.add(c)
+        qs = QuestionSet().add(a).add(d)
+        assert list(qs.compile()) == [a, b, c, d]
+        assert list(b.compile()) == [b, c]
+
+    def test_deep_tree(self, monkeypatch):
+        monkeypatch.setattr(Question, '_get_input',
+                            lambda self, text: text.split(':')[0] * 2)
+        root = question = Question('q0', 'q0')
+        for i in range(1, 5000):
+            sub = Question('q%d' % i, 'q%d' % i)
+            question.add(sub)
+            question = sub
+        answers = root.ask()
+        assert len(answers) == 5000
+        assert answers['q4999'] == 'q4999q4999'
+
+    def test_subquestions_see_earlier_answers(self, give_input):
+        host = Question('host?', 'host')
+        port = Question('port for %(host)s?', 'port')
+        host.add(port)
+        qs = QuestionSet().add(host).add(Question('%(port)s ok?', 'ok'))
+        prompts = []
+
+        def mock_input(self, text):
+            prompts.append(text)
+            return 'x'
+
+        for q in qs.compile():
+            q._get_input = mock_input.__get__(q)
+        qs.ask()
+        assert prompts == ['host?: ', 'port for x?: ', 'x ok?: ']
+
+
+class TestAnswerContext(object):
+
+    def test_layers(self):
+        base = {'a': 1, 'b': 2}
+        context = AnswerContext({}, base)
+        context['b'] = 3
+        context['c'] = 4
+        assert base == {'a': 1, 'b': 2}
+        assert context.given == {'b': 3, 'c': 4}
+        assert context.materialize() == {'a': 1, 'b': 3, 'c': 4}
+
+    def test_ask_leaves_answers_alone(self, give_input):
+        question = Question('favorite %(kind)s?', 'food')
+        give_input(question, ['pesto'])
+        answers = {'kind': 'food'}
+        assert question.ask(answers) == {'food': 'pesto'}
+        assert answers == {'kind': 'food'}
+
+    def test_validators_read_context(self, give_input):
+        seen = []
+
+        class SeeingValidator(Validator):
+
+            def validate(self, value):
+                seen.append(dict(self.answers))
+                return super(SeeingValidator, self).validate(value)
+
+        q1 = Question('one?', 'one')
+        q2 = Question('two?', 'two', validator=SeeingValidator())
+        give_input(q1, ['1'])
+        give_input(q2, ['2'])
+        qs = QuestionSet().add(q1).add(q2)
+        qs.answers = {'zero': '0'}
+        assert qs.ask() == {'zero': '0', 'one': '1', 'two': '2'}
+        assert seen == [{'zero': '0', 'one': '1'}]
+        assert isinstance(q2.validator.answers, AnswerContext)
+
+
+class TestQuestionTemplate(object):
+
+    def test_prompt_dependencies(self):
+        q = Question('Why is %(food)s your favorite %(meal)s?', 'why')
+        assert q.prompt_dependencies == frozenset(['food', 'meal'])
+
+    def test_question_can_be_replaced(self):
+        q = Question('Why %(food)s?', 'why')
+        q.question = 'When %(time)s?'
+        assert q.question == 'When %(time)s?'
+        assert q.prompt_dependencies == frozenset(['time'])
+
+
+class TestIncrementalRetry(object):
+
+    def test_only_changed_and_dependent_questions_are_asked(self, monkeypatch):
+        replies = {
+            'Kind?': ['gpu', 'cpu'],
+            'Host?': ['0', '0'],
+            'Port for %(host)s?': ['22', ''],
+            'Owner?': ['me'],
+            'Are these answers correct? [yes/abort/retry]': ['retry', 'yes'],
+            'Which answers would you like to change?': ['0', '.'],
+        }
+        prompts = []
+
+        def mock_input(self, text):
+            prompts.append(self.value)
+            return replies[self.question].pop(0)
+
+        monkeypatch.setattr(Question, '_get_input', mock_input)
+        qs = QuestionSet()
+        host = Question('Host?', 'host',
+                        validator=ListValidator(['cpu1', 'gpu1'],
+                                                filters=[PreFilter('kind')]))
+        host.add(Question('Port for %(host)s?', 'port'))
+        qs.add(Question('Kind?', 'kind')).add(host)
+        qs.add(Question('Owner?', 'owner'))
+        answers = qs.ask_and_confirm(incremental_retry=True)
+        assert answers == {'kind': 'cpu', 'host': 'cpu1', 'port': '22',
+                           'owner': 'me'}
+        assert prompts == ['kind', 'host', 'port', 'owner', 'confirm',
+                           'change', 'change', 'kind', 'host', 'port',
+                           'confirm']
+
+    def test_summary_relays_only_changed_items(self, monkeypatch):
+        replies = {
+            'Kind?': ['gpu', 'cpu'],
+            'Owner?': ['me'],
+            'Are these answers correct? [yes/abort/retry]': ['retry', 'yes'],
+            'Which answers would you like to change?': ['0', '.'],
+        }
+        measured = []
+        measure = ListPack._measure
+
+        def mock_input(self, text):
+            return replies[self.question].pop(0)
+
+        def counting_measure(self, item):
+            measured.append(item)
+            return measure(self, item)
+
+        monkeypatch.setattr(Question, '_get_input', mock_input)
+        monkeypatch.setattr(ListPack, '_measure', counting_measure)
+        qs = QuestionSet()
+        qs.add(Question('Kind?', 'kind')).add(Question('Owner?', 'owner'))
+        answers = qs.ask_and_confirm(additional_readonly_items=[('site', 'x')],
+                                     incremental_retry=True)
+        assert answers == {'kind': 'cpu', 'owner': 'me'}
+        # the summary is laid out once, then only the changed answer
+        assert measured == [('site', 'x'), ('kind', 'gpu'), ('owner', 'me'),
+                            ('kind', 'cpu')]
+
+    def test_unchanged_answers_stop_the_cascade(self, monkeypatch):
+        replies = {
+            'Kind?': ['gpu', ''],
+            'Host?': ['0'],
+            'Are these answers correct? [yes/abort/retry]': ['retry', 'yes'],
+            'Which answers would you like to change?': ['0', '.'],
+        }
+        prompts = []
+
+        def mock_input(self, text):
+            prompts.append(self.value)
+            return replies[self.question].pop(0)
+
+        monkeypatch.setattr(Question, '_get_input', mock_input)
+        qs = QuestionSet()
+        qs.add(Question('Kind?', 'kind'))
+        qs.add(Question('Host?', 'host',
+                        validator=ListValidator(['cpu1', 'gpu1'],
+                                                filters=[PreFilter('kind')])))
+        assert qs.ask_and_confirm(incremental_retry=True) == \
+            {'kind': 'gpu', 'host': 'gpu1'}
+        assert prompts == ['kind', 'host', 'confirm', 'change', 'change',
+                           'kind', 'confirm']
+
+    def test_dependencies(self):
+        q = Question('Host in %(rack)s?', 'host',
+                     validator=ListValidator(['a'], filters=[PreFilter('kind')]))
+        assert q.dependencies() == frozenset(['rack', 'kind'])
+        assert Question('%s?', 'x').dependencies() is None
+
+
+class TestPagedMenu(object):
+
+    def test_menu_state_is_reset_per_ask(self, monkeypatch):
+        v = ListValidator(['choice%02d' % i for i in range(25)], page_size=10)
+        q = Question('Pick?', 'pick', validator=v)
+        replies = ['>', '/choice2', '20', '21']
+        states = []
+
+        def mock_input(self, text):
+            states.append((v.page, v.search))
+            return replies.pop(0)
+
+        monkeypatch.setattr(Question, '_get_input', mock_input)
+        assert q.ask() == {'pick': 'choice20'}
+        assert q.ask() == {'pick': 'choice21'}
+        assert states == [(0, None), (1, None), (0, 'choice2'), (0, None)]
+
+
+class TestImport(object):
+
+    def test_heavy_modules_are_deferred(self):
+        # run in a new interpreter, as the tests have imported all of these
+        deferred = ['asyncio', 'concurrent.futures', 'datetime', 'netaddr',
+                    'numpy', 'socket', 'sqlite3']
+        code = ('import sys, qav.questions; '
+                'print(" ".join(m for m in %r if m in sys.modules))' %
+                deferred)
+        out = subprocess.check_output([sys.executable, '-c', code],
+                                      universal_newlines=True)
+        assert out.split() == []
+
+    def test_logger(self):
+        assert logger is logging.getLogger('qav.questions')
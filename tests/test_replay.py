@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import io
+
+from qav.questions import AnswerError, Question, QuestionSet
+from qav.replay import replay, replay_jsonl
+from qav.validators import IntegerValidator, MacAddressValidator
+
+
+def make_question_set():
+    qs = QuestionSet()
+    qs.add(Question('MAC?', 'mac', validator=MacAddressValidator()))
+    qs.add(Question('Rack?', 'rack', validator=IntegerValidator()))
+    return qs
+
+
+class TestReplay(object):
+
+    def test_replay_jsonl(self):
+        source = io.StringIO(
+            '{"mac": "aa:bb:cc:dd:ee:ff", "rack": "4"}\n'
+            '\n'
+            '{"mac": "junk", "rack": 5}\n')
+        results = list(replay_jsonl(make_question_set(), source))
+        assert [r.line for r in results] == [1, 3]
+        assert results[0].ok
+        assert results[0].answers == {'mac': 'aa:bb:cc:dd:ee:ff', 'rack': 4}
+        assert results[1].errors == [
+            AnswerError('mac', 'junk', 'junk is not a valid MAC address.')]
+
+    def test_replay_jsonl_path(self, tmpdir):
+        path = tmpdir.join('answers.jsonl')
+        path.write('{"mac": "aa:bb:cc:dd:ee:ff", "rack": "4"}\n')
+        results = list(replay_jsonl(make_question_set(), str(path)))
+        assert results[0].answers['rack'] == 4
+
+    def test_bad_records(self):
+        results = list(replay(make_question_set(), ['{nope', '[1, 2]']))
+        assert [r.answers for r in results] == [None, None]
+        assert results[0].errors[0].message.startswith('Invalid JSON')
+        assert results[1].errors[0].message == 'Record is not a JSON object.'
+
+    def test_lazy(self):
+        consumed = []
+
+        def lines():
+            for i in range(3):
+                consumed.append(i)
+                yield '{"mac": "aa:bb:cc:dd:ee:ff", "rack": %d}' % i
+
+        results = replay(make_question_set(), lines())
+        next(results)
+        assert consumed == [0]
+
+    def test_compiles_once(self, monkeypatch):
+        compiled = []
+        compile = QuestionSet.compile
+
+        def counting_compile(self):
+            compiled.append(self)
+            return compile(self)
+
+        monkeypatch.setattr(QuestionSet, 'compile', counting_compile)
+        lines = ['{"mac": "aa:bb:cc:dd:ee:ff", "rack": %d}' % i
+                 for i in range(3)]
+        results = list(replay(make_question_set(), lines))
+        assert [r.answers['rack'] for r in results] == [0, 1, 2]
+        assert len(compiled) == 1
+
+    def test_question(self):
+        q = Question('Rack?', 'rack', validator=IntegerValidator())
+        results = list(replay(q, ['{"rack": "7"}', '{"rack": "x"}']))
+        assert results[0].answers == {'rack': 7}
+        assert not results[1].ok
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+import socket
+import threading
+import time
+
+import pytest
+
+from qav.resolver import (
+    CachingResolver,
+    get_resolver,
+    resolve_many,
+    set_resolver,
+)
+from qav.validators import DomainNameValidator
+
+
+class FakeResolver(object):
+
+    def __init__(self, forward, reverse):
+        self.forward = forward
+        self.reverse = reverse
+        self.lookups = 0
+
+    def gethostbyname(self, name):
+        self.lookups += 1
+        if name not in self.forward:
+            raise socket.gaierror(-2, 'Name or service not known')
+        return self.forward[name]
+
+    def gethostbyaddr(self, address):
+        self.lookups += 1
+        if address not in self.reverse:
+            raise socket.herror(1, 'Unknown host')
+        return (self.reverse[address], [], [address])
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake():
+    return FakeResolver({'host.example.com': '10.0.0.1',
+                         'noreverse.example.com': '10.0.0.2'},
+                        {'10.0.0.1': 'host.example.com'})
+
+
+class TestCachingResolver(object):
+
+    def test_positive_cache(self, fake):
+        clock = Clock()
+        resolver = CachingResolver(fake, ttl=10, clock=clock)
+        assert resolver.gethostbyname('host.example.com') == '10.0.0.1'
+        assert resolver.gethostbyname('host.example.com') == '10.0.0.1'
+        assert fake.lookups == 1
+        assert (resolver.hits, resolver.misses) == (1, 1)
+        clock.now = 11
+        resolver.gethostbyname('host.example.com')
+        assert fake.lookups == 2
+
+    def test_negative_cache(self, fake):
+        clock = Clock()
+        resolver = CachingResolver(fake, negative_ttl=5, clock=clock)
+        for i in range(2):
+            with pytest.raises(socket.gaierror):
+                resolver.gethostbyname('nope.example.com')
+        assert fake.lookups == 1
+        clock.now = 6
+        with pytest.raises(socket.gaierror):
+            resolver.gethostbyname('nope.example.com')
+        assert fake.lookups == 2
+
+    def test_maxsize(self, fake):
+        resolver = CachingResolver(fake, maxsize=1)
+        resolver.gethostbyname('host.example.com')
+        resolver.gethostbyname('noreverse.example.com')
+        resolver.gethostbyname('host.example.com')
+        assert fake.lookups == 3
+
+    def test_set_resolver(self, fake):
+        original = get_resolver()
+        try:
+            set_resolver(CachingResolver(fake))
+            v = DomainNameValidator()
+            assert v.validate('host.example.com') is True
+            assert v.validate('host.example.com') is True
+            assert fake.lookups == 2
+        finally:
+            set_resolver(original)
+
+
+class TestDomainNameValidatorResolver(object):
+
+    def test_validate(self, fake):
+        v = DomainNameValidator(resolver=fake)
+        assert v.validate('host.example.com') is True
+        assert v.choice() == 'host.example.com'
+
+    def test_reverse_does_not_resolve(self, fake):
+        v = DomainNameValidator(resolver=fake)
+        assert v.validate('noreverse.example.com') is False
+        assert v.error() == 'ERROR: noreverse.example.com reverse address ' + \
+            '(10.0.0.2) does not resolve.'
+
+
+class SlowResolver(FakeResolver):
+
+    def __init__(self, forward, reverse, delay, hang=()):
+        super(SlowResolver, self).__init__(forward, reverse)
+        self.delay = delay
+        self.hang = hang
+        self.release = threading.Event()
+
+    def gethostbyname(self, name):
+        if name in self.hang:
+            self.release.wait(5)
+        time.sleep(self.delay)
+        return super(SlowResolver, self).gethostbyname(name)
+
+
+class TestResolveMany(object):
+
+    def test_results(self, fake):
+        results = resolve_many(['host.example.com', 'noreverse.example.com',
+                                'nope.example.com'], fake)
+        assert results[0] == ('host.example.com', '10.0.0.1',
+                              'host.example.com', None)
+        assert results[1].address == '10.0.0.2'
+        assert results[1].error == \
+            'noreverse.example.com reverse address (10.0.0.2) does not resolve.'
+        assert results[2].error == 'nope.example.com does not resolve.'
+
+    def test_concurrent(self):
+        names = ['host%d.example.com' % i for i in range(20)]
+        slow = SlowResolver({name: '10.0.0.1' for name in names},
+                            {'10.0.0.1': 'host.example.com'}, delay=0.1)
+        start = time.monotonic()
+        results = resolve_many(names, slow, max_workers=20)
+        assert time.monotonic() - start < 1.0
+        assert all(r.error is None for r in results)
+
+    def test_timeout(self):
+        slow = SlowResolver({'a.example.com': '10.0.0.1',
+                             'b.example.com': '10.0.0.1'},
+                            {'10.0.0.1': 'a.example.com'}, delay=0,
+                            hang=('b.example.com',))
+        try:
+            results = resolve_many(['a.example.com', 'b.example.com'], slow,
+                                   timeout=0.2)
+        finally:
+            slow.release.set()
+        assert results[0].error is None
+        assert results[1].error == 'b.example.com lookup timed out.'
+
+    def test_domain_name_validator(self, fake):
+        v = DomainNameValidator(resolver=fake)
+        result = v.validate_many(['host.example.com', 'localhost',
+                                  'nope.example.com', 'host.example.com'])
+        assert result.valid == [True, False, False, True]
+        assert result.errors[1] == \
+            'localhost is not a fully qualified domain name.'
+        assert v.choice() is None
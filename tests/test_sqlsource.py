@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import sqlite3
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from qav import sqlsource
+from qav.filters import DynamicFilter, PostFilter, PreFilter, SubFilter
+from qav.sqlsource import SQLiteChoices, connect
+from qav.validators import HashValidator, ListValidator
+
+
+@pytest.fixture
+def hosts():
+    connection = sqlite3.connect(':memory:')
+    connection.execute('CREATE TABLE hosts (name TEXT, site TEXT)')
+    connection.executemany('INSERT INTO hosts VALUES (?, ?)', [
+        ('web2', 'east'), ('Web1', 'west'), ('web1', 'east'),
+        ('db*1', 'west'), ('gpu10', 'east'),
+    ])
+    return connection
+
+
+class TestSQLiteChoices(object):
+
+    def test_unfiltered(self, hosts):
+        source = SQLiteChoices(hosts, 'hosts', 'name')
+        assert source.queries == 0
+        v = ListValidator(source)
+        assert v.choices == ['Web1', 'db*1', 'gpu10', 'web1', 'web2']
+        assert source.queries == 1
+
+    def test_pushdown(self, hosts):
+        source = SQLiteChoices(hosts, 'hosts', 'name')
+        v = ListValidator(source, filters=[PreFilter('prefix'),
+                                           SubFilter('eb')])
+        v.answers = {'prefix': 'w'}
+        assert v.choices == ['web1', 'web2']
+        assert v.validate('1') is True
+        assert v.choice() == 'web2'
+        v.answers = {'prefix': 'g'}
+        assert v.choices == []
+        assert source.queries == 2
+
+    def test_glob_characters_are_literal(self, hosts):
+        v = ListValidator(SQLiteChoices(hosts, 'hosts', 'name'),
+                          filters=[PreFilter('db*')])
+        assert v.choices == ['db*1']
+        v = ListValidator(SQLiteChoices(hosts, 'hosts', 'name'),
+                          filters=[PreFilter('d?')])
+        assert v.choices == []
+
+    def test_remaining_filters(self, hosts):
+        source = SQLiteChoices(hosts, 'hosts', 'name')
+        v = ListValidator(source, filters=[
+            PostFilter('1'),
+            DynamicFilter(lambda value, table: value.islower())])
+        assert v.choices == ['Web1']
+
+    def test_hash_validator(self, hosts):
+        source = SQLiteChoices(hosts, 'hosts', 'name', value_column='site')
+        v = HashValidator(source, filters=[PreFilter('we')])
+        assert list(v.choices.items()) == [('Web1', 'west'), ('db*1', 'west')]
+        assert v.validate('db*1') is True
+
+    def test_shared_connection(self, tmp_path):
+        path = str(tmp_path / 'hosts.db')
+        try:
+            connection = connect(path)
+            connection.execute('CREATE TABLE hosts (name TEXT)')
+            connection.execute("INSERT INTO hosts VALUES ('web1')")
+            a = SQLiteChoices(path, 'hosts', 'name')
+            b = SQLiteChoices(path, 'hosts', 'name')
+            assert a.connection() is b.connection() is connection
+            # and is used under one lock
+            assert a._connection_and_lock()[1] is b._connection_and_lock()[1]
+            assert list(b) == ['web1']
+        finally:
+            sqlsource.close_all()
+
+    def test_own_connection_lock(self, hosts):
+        source = SQLiteChoices(hosts, 'hosts', 'name')
+        assert source._connection_and_lock() == (hosts, source._lock)
+        list(source)
+        assert sqlsource._connections == {}
+
+    def test_query_order_is_kept(self, hosts):
+        source = SQLiteChoices(hosts, 'hosts', 'name', order_by='site')
+        assert source.ordered
+        v = ListValidator(source, filters=[PostFilter('1')])
+        # ORDER BY site, not sorted again by name
+        assert v.choices in (['web1', 'Web1', 'db*1'],
+                             ['web1', 'db*1', 'Web1'])
+
+    def test_threads_share_connection(self, tmp_path, monkeypatch):
+        # small batches, so the threads interleave on the connection
+        monkeypatch.setattr(sqlsource, '_BATCH', 3)
+        path = str(tmp_path / 'hosts.db')
+        try:
+            connection = connect(path)
+            connection.execute('CREATE TABLE hosts (name TEXT)')
+            connection.executemany('INSERT INTO hosts VALUES (?)',
+                                   [('host%03d' % i,) for i in range(200)])
+            expected = ['host%03d' % i for i in range(200)]
+
+            def read(_):
+                return list(SQLiteChoices(path, 'hosts', 'name'))
+
+            with ThreadPoolExecutor(8) as pool:
+                for result in pool.map(read, range(32)):
+                    assert result == expected
+        finally:
+            sqlsource.close_all()
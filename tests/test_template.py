@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from qav.template import Template
+
+
+class TestTemplate(object):
+
+    def test_plain(self):
+        t = Template('Your age?')
+        assert t.keys == frozenset()
+        assert t.render({}) == 'Your age?'
+
+    def test_keys(self):
+        t = Template('Port for %(host)s (%(count)03d%% used)?')
+        assert t.keys == frozenset(['host', 'count'])
+        assert not t.opaque
+        assert t.render({'host': 'gpu1', 'count': 7}) == \
+            'Port for gpu1 (007% used)?'
+
+    def test_tuple_answer(self):
+        assert Template('%(pair)s').render({'pair': (1, 2)}) == '(1, 2)'
+
+    def test_missing_answer(self):
+        with pytest.raises(KeyError):
+            Template('%(host)s').render({})
+
+    @pytest.mark.parametrize('template', ('%s?', 'oops %', '%(a)s %z'))
+    def test_opaque(self, template):
+        t = Template(template)
+        assert t.opaque
+        try:
+            expected = template % {'a': 1}
+        except (TypeError, ValueError) as e:
+            with pytest.raises(type(e)):
+                t.render({'a': 1})
+        else:
+            assert t.render({'a': 1}) == expected
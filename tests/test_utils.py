@@ -1,7 +1,20 @@
 # -*- coding: utf-8 -*-
 
-from qav.utils import bold
+import re
+
+from qav.utils import LazyRegex, bold
 
 
 def test_bold():
     assert bold('foo') == '\x1b[1mfoo\x1b[0m'
+
+
+def test_lazy_regex():
+    class Holder(object):
+        regex = LazyRegex(r'a+b', re.IGNORECASE)
+
+    lazy = Holder.__dict__['regex']
+    assert lazy._compiled is None
+    assert Holder.regex.match('AAB')
+    assert Holder().regex is lazy.compiled()
+    assert lazy._compiled is not None
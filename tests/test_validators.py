@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import datetime
+import ipaddress
+import socket
 from collections import OrderedDict
+from copy import copy
 
 import pytest
 from netaddr import IPAddress
 
-from qav.filters import PreFilter
+from qav.filters import DynamicFilter, PreFilter
 from qav.validators import (
+    BatchResult,
     Validator,
     CompactListValidator,
     DateValidator,
@@ -92,6 +97,21 @@ class TestDateValidator(object):
         assert DateValidator().validate(value) is False
 
 
+class StandInResolver(object):
+
+    def gethostbyname(self, name):
+        addresses = {'host.example.com': '10.0.0.1',
+                     'noreverse.example.com': '10.0.0.2'}
+        if name not in addresses:
+            raise socket.gaierror(-2, 'Name or service not known')
+        return addresses[name]
+
+    def gethostbyaddr(self, address):
+        if address != '10.0.0.1':
+            raise socket.herror(1, 'Unknown host')
+        return ('host.example.com', [], [address])
+
+
 class TestDomainNameValidator(object):
 
     def test_is_fqdn(self):
@@ -109,6 +129,36 @@ class TestDomainNameValidator(object):
         assert v.validate('lsdkajflsdjsldsfjk.com') is False
         assert v.error() == 'ERROR: lsdkajflsdjsldsfjk.com does not resolve.'
 
+    def test_validate_async(self):
+        v = DomainNameValidator()
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(v.validate_async('localhost')) \
+                is False
+        finally:
+            loop.close()
+        assert v.error() == 'ERROR: localhost is not a fully qualified domain name.'
+
+    @pytest.mark.parametrize('value,valid,error', (
+        ('host.example.com', True, None),
+        ('missing.example.com', False,
+         'ERROR: missing.example.com does not resolve.'),
+        ('noreverse.example.com', False,
+         'ERROR: noreverse.example.com reverse address (10.0.0.2) '
+         'does not resolve.'),
+    ))
+    def test_validate_async_lookups(self, value, valid, error):
+        v = DomainNameValidator(resolver=StandInResolver())
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(v.validate_async(value)) is valid
+        finally:
+            loop.close()
+        if valid:
+            assert v.choice() == value
+        else:
+            assert v.error() == error
+
 
 class TestMacAddressValidator(object):
 
@@ -156,6 +206,17 @@ class TestIPAddressValidator(object):
         assert v.validate(value) is False
         assert v.error() == 'ERROR: %s is not a valid IP address.' % value
 
+    def test_stdlib_results(self):
+        v = IPAddressValidator()
+        v.use_netaddr = False
+        assert v.validate('10.88.88.1') is True
+        assert v.choice() == ipaddress.IPv4Address('10.88.88.1')
+        assert v.validate_many(['::1']).choices == [ipaddress.ip_address('::1')]
+
+    @pytest.mark.parametrize('value', ('fe80::1%eth0', '127.1', None))
+    def test_rejected_like_netaddr(self, value):
+        assert IPAddressValidator().validate(value) is False
+
 
 class TestIPNetmaskValidator(object):
 
@@ -163,6 +224,8 @@ class TestIPNetmaskValidator(object):
         '255.255.255.0',
         '255.255.254.0',
         '0.0.0.0',
+        '255.255.255.255',
+        'ffff:ffff:ffff:ffff:ffff:ffff:ffff:fff8',
     ))
     def test_validate_success(self, value):
         v = IPNetmaskValidator()
@@ -171,6 +234,8 @@ class TestIPNetmaskValidator(object):
 
     @pytest.mark.parametrize('value', (
         '62.125.24.5',
+        '255.255.0.255',
+        'ffff::ffff',
         '10.20.20.100/24',
         'foobar',
         '',
@@ -180,6 +245,20 @@ class TestIPNetmaskValidator(object):
         assert v.validate(value) is False
         assert v.error_message is not None
 
+    def test_validate_many(self):
+        values = ['255.255.255.0', '255.255.0.255', 'foobar']
+        result = IPNetmaskValidator().validate_many(values)
+        assert result.choices == [IPAddress('255.255.255.0'), None, None]
+        assert result.errors == [
+            None,
+            '255.255.0.255 is not a valid IP netmask.',
+            'foobar is not a valid IP address.',
+        ]
+        v = IPNetmaskValidator()
+        v.use_netaddr = False
+        assert v.validate_many(['255.255.254.0']).choices == \
+            [ipaddress.IPv4Address('255.255.254.0')]
+
 
 class TestURIValidator(object):
 
@@ -227,6 +306,67 @@ class TestEmailValidator(object):
         assert v.error() == 'ERROR: %s is not a valid email address.' % value
 
 
+class TestFilteredValidator(object):
+
+    def test_cache_hits(self):
+        v = ListValidator(['a', 'b', 'c'], filters=[PreFilter('a')])
+        assert v.choices == ['a']
+        assert v.choices == ['a']
+        assert v.validate('0') is True
+        assert v.cache_misses == 1
+        assert v.cache_hits == 2
+
+    def test_rebuilt_when_dependent_answer_changes(self):
+        v = ListValidator(['foo', 'bar'], filters=[PreFilter('prefix')])
+        v.answers = {'prefix': 'f', 'other': 1}
+        assert v.choices == ['foo']
+        v.answers = {'prefix': 'f', 'other': 2}
+        assert v.choices == ['foo']
+        assert v.cache_misses == 1
+        v.answers = {'prefix': 'b', 'other': 2}
+        assert v.choices == ['bar']
+        assert v.cache_misses == 2
+
+    def test_filter_reading_whole_table(self):
+        def prune_answered(value, table):
+            return value in table.values()
+
+        v = ListValidator(['foo', 'bar'],
+                          filters=[DynamicFilter(prune_answered)])
+        v.answers = {'x': 'foo'}
+        assert v.choices == ['bar']
+        v.answers = {'y': 'bar'}
+        assert v.choices == ['foo']
+        assert v.cache_misses == 2
+
+    def test_invalidate(self):
+        choices = ['a', 'b']
+        v = ListValidator(choices)
+        assert v.choices == ['a', 'b']
+        choices.append('c')
+        assert v.choices == ['a', 'b']
+        v.invalidate()
+        assert v.choices == ['a', 'b', 'c']
+
+    def test_replacing_filters(self):
+        v = HashValidator({'ten': '10', 'twenty': '20'})
+        assert list(v.choices) == ['ten', 'twenty']
+        v.filters = [PreFilter('2')]
+        assert list(v.choices) == ['twenty']
+
+    def test_slots(self):
+        v = ListValidator(['a'], filters=[PreFilter('a')])
+        assert not hasattr(v, '__dict__')
+        assert not hasattr(IntegerValidator(), '__dict__')
+
+    def test_settings(self):
+        v = ListValidator(['a'])
+        assert v.index_threshold is None
+        v.index_threshold = 0
+        assert v.index_threshold == 0
+        assert ListValidator(['a']).index_threshold is None
+
+
 class TestListValidator(object):
 
     def test_non_choices(self):
@@ -243,6 +383,18 @@ class TestListValidator(object):
         v = ListValidator(['c', 'b', 'f', 'a'])
         assert v.choices == ['a', 'b', 'c', 'f']
 
+    def test_choices_sorted_once(self):
+        choices = ['cb', 'ba', 'ca', 'ab']
+        v = ListValidator(choices, filters=[PreFilter('start')])
+        v.answers = {'start': 'c'}
+        assert v.choices == ['ca', 'cb']
+        ordered = v._ordered
+        v.answers = {'start': 'b'}
+        assert v.choices == ['ba']
+        assert v._ordered is ordered
+        # the caller's list is left alone
+        assert choices == ['cb', 'ba', 'ca', 'ab']
+
     def test_print_choices(self, capsys):
         v = ListValidator(['a', 'b', 'c'])
         assert v.print_choices() is True
@@ -258,6 +410,85 @@ class TestListValidator(object):
         assert v.print_choices() is False
         assert v.validate('0') is False
 
+    def test_paged_menu(self, capsys):
+        v = ListValidator(['choice%02d' % i for i in range(25)], page_size=10)
+        assert v.print_choices() is True
+        out, err = capsys.readouterr()
+        lines = out.splitlines()
+        assert lines[1] == ' [0] - choice00'
+        assert lines[10] == ' [9] - choice09'
+        assert lines[11].startswith('Page 1 of 3:')
+        assert v.validate('>') is False
+        assert v.error() == ''
+        v.print_choices()
+        out, err = capsys.readouterr()
+        assert out.splitlines()[1] == ' [10] - choice10'
+        assert v.validate(':9') is False
+        v.print_choices()
+        out, err = capsys.readouterr()
+        assert out.splitlines()[1] == ' [20] - choice20'
+        assert 'Page 3 of 3:' in out
+
+    def test_paged_menu_search(self, capsys):
+        v = ListValidator(['choice%02d' % i for i in range(25)], page_size=10)
+        assert v.validate('/3') is False
+        v.print_choices()
+        out, err = capsys.readouterr()
+        assert out.splitlines()[1:4] == [
+            ' [3] - choice03', ' [13] - choice13', ' [23] - choice23']
+        assert '3 of 25 choices match "3"' in out
+        # numbers still refer to the full list
+        assert v.validate('13') is True
+        assert v.choice() == 'choice13'
+        assert v.validate('/') is False
+        assert v.search is None
+
+    def test_fuzzy_unique(self):
+        v = ListValidator(['gpu01.example.org', 'gpu12.example.org',
+                           'cpu01.example.org'], fuzzy=True)
+        assert v.validate('GPU1') is True
+        assert v.choice() == 'gpu12.example.org'
+        # short fragments match prefixes only
+        assert v.validate('cp') is True
+        assert v.choice() == 'cpu01.example.org'
+        assert v.validate('tpu') is False
+        assert v.error() == 'ERROR: tpu is not a valid choice.'
+
+    def test_fuzzy_shortlist(self):
+        v = ListValidator(['xgpu10', 'gpu10-old', 'gpu10', 'gpu11'],
+                          fuzzy=True)
+        # an exact match wins over longer ones
+        assert v.validate('GPU10') is True
+        assert v.choice() == 'gpu10'
+        v.shortlist_size = 2
+        assert v.validate('gpu1') is False
+        assert v.error() == \
+            'ERROR: gpu1 matches 4 choices: [0] gpu10, [2] gpu11, ...'
+        result = v.validate_many(['pu10-', 'pu1'])
+        assert result.valid == [True, False]
+        assert result.choices == ['gpu10-old', None]
+        assert result.errors[1].startswith('pu1 matches 4 choices')
+
+    def test_fuzzy_numbers(self):
+        v = ListValidator(['host112', 'a'], fuzzy=True)
+        assert v.validate('112') is False
+        assert v.error() == 'ERROR: 112 is not a valid choice.'
+        assert v.validate_many(['112']).errors == [
+            '112 is not a valid choice.']
+        assert v.validate('1') is True
+        assert v.choice() == 'host112'
+
+    def test_fuzzy_off(self):
+        v = ListValidator(['gpu01', 'cpu01'])
+        assert v.validate('gpu') is False
+
+    def test_paged_menu_choices_win(self):
+        v = ListValidator(['<', '>'], page_size=1)
+        assert v.validate('>') is True
+        assert v.choice() == '>'
+        assert v.validate('x') is False
+        assert v.error() == 'ERROR: x is not a valid choice.'
+
     @pytest.mark.parametrize('value,idx', [
         ('a', '0'),
         ('b', '1'),
@@ -354,6 +585,31 @@ class TestHashValidator(object):
  [1] - twenty (20)
 '''
 
+    def test_print_choices_verbose(self, capsys):
+        v = HashValidator(OrderedDict([('ten', '10'), ('twenty', '20')]))
+        assert v.print_choices() is True
+        out, err = capsys.readouterr()
+        assert out == '''Please select from the following choices:
+ [0] - ten (10)
+ [1] - twenty (20)
+'''
+
+    def test_print_choices_not_verbose(self, capsys):
+        v = HashValidator(OrderedDict([('ten', '10'), ('twenty', '20')]),
+                          verbose=False)
+        assert v.print_choices() is True
+        out, err = capsys.readouterr()
+        assert out == '''Please select from the following choices:
+ [0] - ten
+ [1] - twenty
+'''
+
+    def test_print_choices_renders_one_snapshot(self):
+        v = HashValidator({str(i): str(i) for i in range(100)})
+        v.render_choices(v.choices)
+        assert v.cache_misses == 1
+        assert v.cache_hits == 0
+
     @pytest.mark.parametrize('key,value', [
         ('ten', '10'),
         ('twenty', '20'),
@@ -384,3 +640,49 @@ class TestIntegerValidator(object):
     @pytest.mark.parametrize('value', ('a2', '4a', 'foo', '7.2'))
     def test_validate_failure(self, value):
         assert IntegerValidator().validate(value) is False
+
+
+class TestValidateMany(object):
+
+    @pytest.mark.parametrize('validator,values', [
+        (Validator(), ['foo', '', 'bar']),
+        (YesNoValidator(), ['yes', 'NO', 'maybe']),
+        (DateValidator(), ['20180518', '20181399', 'foo']),
+        (DateValidator(blank=True), ['', '20180518']),
+        (MacAddressValidator(), ['AA:01:54:21:BB:0F', 'foobar']),
+        (IPAddressValidator(), ['10.88.88.1', '10.500.10.10']),
+        (IPNetmaskValidator(), ['255.255.255.0', '255.0.255.0', 'foo']),
+        (EmailValidator(), ['user@example.com', 'user@foo']),
+        (IntegerValidator(), ['2', '7.2']),
+        (ListValidator(['a', 'b', 'c']), ['b', '2', '-1', 'd', '5']),
+        (TupleValidator([('a', 'A'), ('b', 'B')]), ['b', '0', 'B', '9']),
+        (HashValidator({'ten': '10', 'twenty': '20'}), ['ten', '1', 'x']),
+    ])
+    def test_matches_validate(self, validator, values):
+        result = validator.validate_many(values)
+        assert isinstance(result, BatchResult)
+        for value, valid, choice, error in zip(values, *result):
+            single = copy(validator)
+            assert single.validate(value) is valid
+            if valid:
+                assert choice == single.choice()
+                assert error is None
+            else:
+                assert choice is None
+                assert error is not None
+
+    def test_state_untouched(self):
+        v = IntegerValidator()
+        result = v.validate_many(['1', 'x'])
+        assert result.valid == [True, False]
+        assert result.choices == [1, None]
+        assert result.errors == [None, 'x is not a valid integer.']
+        assert v.choice() is None
+        assert v.error_message is None
+
+    def test_fallback_leaves_validator_alone(self):
+        v = YesNoValidator()
+        result = v.validate_many(['yes', 'junk'])
+        assert result.errors == [None, 'Please choose yes or no.']
+        assert v.choice() is None
+        assert v.error_message is None